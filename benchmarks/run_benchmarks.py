@@ -0,0 +1,234 @@
+"""
+Times and memory-profiles every DataCleaning method, and an offline end-to-end pipeline,
+on synthetic data at several scales, and compares the timings against a stored baseline.
+
+Run from the repository root:
+    python -m benchmarks.run_benchmarks --scales 0.1 1 10 --save-baseline
+    python -m benchmarks.run_benchmarks --scales 0.1 1 10
+"""
+import argparse
+import json
+import logging
+import os
+import re
+import sys
+import time
+import tracemalloc
+import warnings
+
+import pandas as pd
+from sqlalchemy import create_engine
+
+from cleaning_kernels import keep_digits, parse_number, strip_chars
+from data_cleaning import DataCleaning
+from date_parsing import parse_dates
+from data_utils import DatabaseConnector
+from synthetic_data import BASE_ROWS, SyntheticDataGenerator
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), 'baseline.json')
+
+# Benchmark name -> (source table, function of (cleaner, raw frame))
+CASES = {
+    'clean_user_data': ('legacy_users', lambda cleaner, df: cleaner.clean_user_data(df)),
+    'clean_card_data': ('card_details', lambda cleaner, df: cleaner.clean_card_data(df)),
+    'clean_store_data': ('store_details', lambda cleaner, df: cleaner.clean_store_data(df)),
+    'convert_product_weights': ('products', lambda cleaner, df: cleaner.convert_product_weights(df)),
+    'clean_products_data': ('products', lambda cleaner, df: cleaner.clean_products_data(cleaner.convert_product_weights(df))),
+    'clean_orders_data': ('orders_table', lambda cleaner, df: cleaner.clean_orders_data(df)),
+    'clean_orders_data_parallel': ('orders_table', lambda cleaner, df: cleaner.clean_orders_data_parallel(df)),
+    'clean_date_data': ('date_details', lambda cleaner, df: cleaner.clean_date_data(df)),
+}
+
+# Benchmarks run once at a fixed row count regardless of --scales, for methods whose cost is
+# dominated by the number of rows: benchmark name -> (source table, rows, function of (cleaner, raw frame))
+# Cases ending in '_mixed' or '_legacy' time the expression the preceding case replaced, for reference
+LARGE_CASES = {
+    'convert_product_weights': ('products', 1_000_000, lambda cleaner, df: cleaner.convert_product_weights(df)),
+    'parse_dates': ('products', 1_000_000, lambda cleaner, df: parse_dates(df['date_added'])),
+    'parse_dates_mixed': ('products', 1_000_000,
+                          lambda cleaner, df: pd.to_datetime(df['date_added'], errors='coerce', format='mixed')),
+    'strip_chars': ('card_details', 1_000_000, lambda cleaner, df: strip_chars(df['card_number'], '?')),
+    'strip_chars_legacy': ('card_details', 1_000_000,
+                           lambda cleaner, df: df['card_number'].astype(str).apply(lambda x: x.replace('?', ''))),
+    'keep_digits': ('store_details', 1_000_000, lambda cleaner, df: keep_digits(df['staff_numbers'])),
+    'keep_digits_legacy': ('store_details', 1_000_000,
+                           lambda cleaner, df: df['staff_numbers'].astype(str).apply(lambda x: re.sub(r'\D', '', x))),
+    'parse_number_price': ('products', 1_000_000, lambda cleaner, df: parse_number(df['product_price'], '£,')),
+    'parse_number_price_legacy': ('products', 1_000_000, lambda cleaner, df: pd.to_numeric(
+        df['product_price'].replace({'£': '', ',': ''}, regex=True), errors='coerce')),
+    'parse_number_latitude': ('store_details', 1_000_000, lambda cleaner, df: parse_number(df['latitude'], '?')),
+    'parse_number_latitude_legacy': ('store_details', 1_000_000, lambda cleaner, df: pd.to_numeric(
+        df['latitude'].astype(str).apply(lambda x: x.replace('?', '')), errors='coerce')),
+}
+
+
+def measure(func, repeats=3):
+    """
+    Runs a function several times and reports its best wall and CPU time, then runs it once
+    more under tracemalloc to record its peak memory.
+
+    Args:
+    func (callable): Function of no arguments.
+    repeats (int): Number of timed runs (default 3).
+
+    Returns:
+    dict: 'wall' and 'cpu' in seconds and 'peak_mb' in megabytes.
+    """
+    walls, cpus = [], []
+    for _ in range(repeats):
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+        func()
+        walls.append(time.perf_counter() - wall_start)
+        cpus.append(time.process_time() - cpu_start)
+
+    # Tracing slows the run down, so memory is measured separately from time
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {'wall': min(walls), 'cpu': min(cpus), 'peak_mb': peak / 1024 ** 2}
+
+
+def run_offline_pipeline(generator):
+    """
+    Cleans every synthetic source and loads the results into an in-memory SQLite database.
+
+    Args:
+    generator (SyntheticDataGenerator): The source of raw data.
+    """
+    cleaner = DataCleaning()
+    connector = DatabaseConnector()
+    engine = create_engine('sqlite://')
+    products = cleaner.convert_product_weights(generator.products())
+    tables = {
+        'dim_users': cleaner.clean_user_data(generator.legacy_users()),
+        'dim_card_details': cleaner.clean_card_data(generator.card_details()),
+        'dim_store_details': cleaner.clean_store_data(generator.store_details()),
+        'dim_products': cleaner.clean_products_data(products),
+        'dim_date_times': cleaner.clean_date_data(generator.date_details()),
+        'orders_table': cleaner.clean_orders_data(generator.orders_table()),
+    }
+    for table_name, df in tables.items():
+        if not connector.upload_to_db(df, table_name, engine):
+            raise RuntimeError(f"Upload of '{table_name}' failed.")
+    engine.dispose()
+
+
+def run(scales, repeats):
+    """
+    Runs every benchmark at every scale.
+
+    Args:
+    scales (list): Scale factors passed to SyntheticDataGenerator.
+    repeats (int): Number of timed runs per benchmark.
+
+    Returns:
+    dict: Results keyed by '<benchmark>@<scale>'.
+    """
+    results = {}
+    for scale in scales:
+        generator = SyntheticDataGenerator(scale=scale)
+        cleaner = DataCleaning()
+        for name, (source, func) in CASES.items():
+            raw = getattr(generator, source)()
+            result = measure(lambda: func(cleaner, raw.copy()), repeats)
+            result['rows'] = len(raw)
+            results[f"{name}@{scale}"] = result
+            print(f"{name + '@' + str(scale):<35} {result['rows']:>10} rows  {result['wall']:8.3f}s wall  "
+                  f"{result['cpu']:8.3f}s cpu  {result['peak_mb']:9.1f} MB peak")
+
+        result = measure(lambda: run_offline_pipeline(generator), repeats=1)
+        results[f"offline_pipeline@{scale}"] = result
+        print(f"{'offline_pipeline@' + str(scale):<35} {'':>15}  {result['wall']:8.3f}s wall  "
+              f"{result['cpu']:8.3f}s cpu  {result['peak_mb']:9.1f} MB peak")
+    return results
+
+
+def run_large(repeats):
+    """
+    Runs every benchmark in LARGE_CASES at its fixed row count.
+
+    Args:
+    repeats (int): Number of timed runs per benchmark.
+
+    Returns:
+    dict: Results keyed by '<benchmark>@<rows>'.
+    """
+    results = {}
+    cleaner = DataCleaning()
+    sources = {}
+    for name, (source, rows, func) in LARGE_CASES.items():
+        if (source, rows) not in sources:
+            # Scale just past the target so truncation never leaves the frame a row short
+            generator = SyntheticDataGenerator(scale=(rows + 1) / BASE_ROWS[source])
+            sources[source, rows] = getattr(generator, source)().head(rows)
+        raw = sources[source, rows]
+        result = measure(lambda: func(cleaner, raw.copy()), repeats)
+        result['rows'] = len(raw)
+        results[f"{name}@{rows}"] = result
+        print(f"{name + '@' + str(rows):<35} {result['rows']:>10} rows  {result['wall']:8.3f}s wall  "
+              f"{result['cpu']:8.3f}s cpu  {result['peak_mb']:9.1f} MB peak")
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """
+    Compares wall times against a baseline.
+
+    Args:
+    results (dict): Results from `run`.
+    baseline (dict): Previously saved results.
+    tolerance (float): Allowed slowdown as a fraction, e.g. 0.25 for 25%.
+
+    Returns:
+    list: Names of the benchmarks that regressed.
+    """
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        ratio = result['wall'] / baseline[name]['wall'] if baseline[name]['wall'] > 0 else float('inf')
+        flag = 'REGRESSION' if ratio > 1 + tolerance else ''
+        print(f"{name:<35} {baseline[name]['wall']:8.3f}s -> {result['wall']:8.3f}s  x{ratio:5.2f}  {flag}")
+        if flag:
+            regressions.append(name)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the DataCleaning methods on synthetic data.')
+    parser.add_argument('--scales', type=float, nargs='+', default=[0.1, 1.0], help='Scale factors to run.')
+    parser.add_argument('--repeats', type=int, default=3, help='Timed runs per benchmark.')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='Path of the baseline JSON file.')
+    parser.add_argument('--save-baseline', action='store_true', help='Store these results as the new baseline.')
+    parser.add_argument('--skip-large', action='store_true', help='Skip the fixed-size benchmarks in LARGE_CASES.')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='Allowed slowdown before flagging a regression.')
+    args = parser.parse_args()
+
+    # Keep the output readable: the cleaners emit pandas warnings and the connector logs every upload
+    warnings.simplefilter('ignore')
+    logging.getLogger().setLevel(logging.WARNING)
+
+    results = run(args.scales, args.repeats)
+    if not args.skip_large:
+        results.update(run_large(args.repeats))
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"Baseline saved to {args.baseline}.")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --save-baseline first.")
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    print('\nComparison with baseline:')
+    regressions = compare(results, baseline, args.tolerance)
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,114 @@
+"""
+Measures the throughput and peak memory of DataExtractor.extract_from_s3 against an in-process
+S3 mock (moto), on a synthetic products CSV, for each of its download modes. A read of the whole
+body decoded to a string, as extract_from_s3 did before streaming, is included for reference.
+
+Requires moto. Run from the repository root:
+    python -m benchmarks.s3_benchmark --rows 200000 500000
+"""
+import argparse
+import io
+import logging
+import os
+import sys
+import warnings
+
+import boto3
+import pandas as pd
+from moto import mock_aws
+
+from benchmarks.run_benchmarks import measure
+from data_extraction import DataExtractor
+from synthetic_data import BASE_ROWS, SyntheticDataGenerator
+
+BUCKET = 'benchmark-bucket'
+
+# Benchmark name -> function of (extractor, S3 address)
+CASES = {
+    'read_decode': lambda extractor, address: read_decode(address),
+    'single_get': lambda extractor, address: extractor.extract_from_s3(address, part_size=1024 ** 4),
+    'ranged_gets': lambda extractor, address: extractor.extract_from_s3(address, part_size=4 * 1024 ** 2),
+    'chunked': lambda extractor, address: sum(len(chunk) for chunk in extractor.extract_from_s3(address, chunksize=50000)),
+}
+
+
+def read_decode(s3_address):
+    """
+    Reads a CSV the way extract_from_s3 did before streaming: the whole body is read, decoded to
+    a string and parsed from a StringIO.
+
+    Args:
+    s3_address (str): S3 URL for the CSV file.
+
+    Returns:
+    pd.DataFrame: The parsed CSV.
+    """
+    bucket_name, file_key = s3_address.replace("s3://", "").split("/", 1)
+    s3_object = boto3.client('s3').get_object(Bucket=bucket_name, Key=file_key)
+    return pd.read_csv(io.StringIO(s3_object['Body'].read().decode('utf-8')))
+
+
+def upload_products(rows):
+    """
+    Uploads a synthetic products CSV of the given size to the mocked bucket.
+
+    Args:
+    rows (int): Number of product rows.
+
+    Returns:
+    tuple: The S3 address and the size of the object in bytes.
+    """
+    generator = SyntheticDataGenerator(scale=(rows + 1) / BASE_ROWS['products'])
+    body = generator.products().head(rows).to_csv(index=False).encode('utf-8')
+    file_key = f'products-{rows}.csv'
+    boto3.client('s3').put_object(Bucket=BUCKET, Key=file_key, Body=body)
+    return f's3://{BUCKET}/{file_key}', len(body)
+
+
+def run(row_counts, repeats):
+    """
+    Runs every benchmark on a products CSV of each size.
+
+    Args:
+    row_counts (list): Numbers of rows of the uploaded CSVs.
+    repeats (int): Number of timed runs per benchmark.
+
+    Returns:
+    dict: Results keyed by '<benchmark>@<rows>'.
+    """
+    results = {}
+    with mock_aws():
+        boto3.client('s3').create_bucket(Bucket=BUCKET)
+        extractor = DataExtractor()
+        for rows in row_counts:
+            address, size = upload_products(rows)
+            for name, func in CASES.items():
+                result = measure(lambda: func(extractor, address), repeats)
+                result['rows'] = rows
+                result['mb_per_second'] = size / 1024 ** 2 / result['wall'] if result['wall'] > 0 else float('inf')
+                results[f"{name}@{rows}"] = result
+                print(f"{name + '@' + str(rows):<25} {size / 1024 ** 2:8.1f} MB  {result['wall']:8.3f}s wall  "
+                      f"{result['mb_per_second']:8.1f} MB/s  {result['peak_mb']:9.1f} MB peak")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark extract_from_s3 against a mocked S3 bucket.')
+    parser.add_argument('--rows', type=int, nargs='+', default=[200000], help='Rows of the uploaded products CSVs.')
+    parser.add_argument('--repeats', type=int, default=3, help='Timed runs per benchmark.')
+    args = parser.parse_args()
+
+    # moto needs credentials to sign requests, even though none leave the process
+    for variable in ('AWS_ACCESS_KEY_ID', 'AWS_SECRET_ACCESS_KEY'):
+        os.environ.setdefault(variable, 'benchmark')
+    os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+
+    warnings.simplefilter('ignore')
+    logging.getLogger().setLevel(logging.WARNING)
+
+    run(args.rows, args.repeats)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,242 @@
+import os
+import glob
+import json
+import time
+import hashlib
+import logging
+import threading
+import importlib.util
+import pandas as pd
+
+# Modules whose code produces each step's output; editing one invalidates that step's checkpoints
+STEP_MODULES = {
+    'extract': ['data_extraction'],
+    'clean': ['data_cleaning', 'cleaning_kernels', 'date_parsing', 'dtype_optimization', 'dedup_index'],
+}
+
+
+def _json_default(value):
+    # Same conversions as WatermarkStore.advance, so a key holding a numpy scalar or timestamp hashes
+    # like the plain value read back from the watermark file on a rerun
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    if hasattr(value, 'item'):
+        return value.item()
+    return str(value)
+
+
+def frame_fingerprint(df):
+    """
+    Fingerprints a DataFrame's columns, dtypes and values.
+
+    Args:
+    df (pd.DataFrame): The data.
+
+    Returns:
+    str: A hex digest that changes whenever the data changes.
+    """
+    digest = hashlib.sha256(repr([(str(name), str(dtype)) for name, dtype in df.dtypes.items()]).encode())
+    try:
+        hashes = pd.util.hash_pandas_object(df, index=False)
+    except TypeError:
+        # Unhashable cells, e.g. nested JSON values, are hashed through their text form
+        hashes = pd.util.hash_pandas_object(df.astype(str), index=False)
+    digest.update(hashes.to_numpy().tobytes())
+    return digest.hexdigest()[:16]
+
+
+def code_version(step):
+    """
+    Fingerprints the source of the modules that produce a step's output.
+
+    Args:
+    step (str): The step, 'extract' or 'clean'.
+
+    Returns:
+    str: A hex digest of the modules' source files.
+    """
+    digest = hashlib.sha256()
+    for module in STEP_MODULES.get(step, []):
+        spec = importlib.util.find_spec(module)
+        if spec is not None and spec.origin and os.path.exists(spec.origin):
+            with open(spec.origin, 'rb') as f:
+                digest.update(f.read())
+    return digest.hexdigest()[:16]
+
+
+class CheckpointStore:
+    """
+    Persists the raw extract and cleaned output of each pipeline stage as Parquet files, so a
+    rerun after a failure resumes from the last completed step instead of starting over. Frames
+    Arrow cannot represent, e.g. object columns mixing ints and strings, are kept as pickles.
+
+    A checkpoint is keyed by its stage, step, the step's inputs (e.g. the source URL and watermark,
+    or the fingerprint of the raw data) and the version of the code that produced it. The stage's
+    checkpoints are removed once it has been loaded successfully.
+    """
+
+    def __init__(self, checkpoint_dir='.etl_checkpoints', force_stages=()):
+        """
+        Args:
+        checkpoint_dir (str): Directory for the checkpoints (default '.etl_checkpoints').
+        force_stages (iterable): Stages to rerun from scratch, ignoring their existing checkpoints.
+        """
+        self.checkpoint_dir = checkpoint_dir
+        self.force_stages = set(force_stages)
+        self._versions = {}
+        self._lock = threading.Lock()
+
+    def _stage_dir(self, stage):
+        return os.path.join(self.checkpoint_dir, stage)
+
+    def _manifest_path(self, stage):
+        return os.path.join(self._stage_dir(stage), 'manifest.json')
+
+    def _load_manifest(self, stage):
+        try:
+            with open(self._manifest_path(stage), 'r') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except json.JSONDecodeError as e:
+            logging.error(f"Could not parse checkpoint manifest '{self._manifest_path(stage)}': {e}")
+            return {}
+
+    def _save_manifest(self, stage, manifest):
+        tmp_path = f"{self._manifest_path(stage)}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(manifest, f, indent=2, default=_json_default)
+        os.replace(tmp_path, self._manifest_path(stage))
+
+    def _file_name(self, step, key):
+        if step not in self._versions:
+            self._versions[step] = code_version(step)
+        identity = json.dumps({'key': key, 'code_version': self._versions[step]}, sort_keys=True, default=_json_default)
+        return f"{step}-{hashlib.sha256(identity.encode()).hexdigest()[:16]}"
+
+    def _remove_file(self, path):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def load(self, stage, step, key):
+        """
+        Reads a checkpoint.
+
+        Args:
+        stage (str): The pipeline stage, e.g. 'card_data'.
+        step (str): The step within the stage, 'extract' or 'clean'.
+        key (dict): The step's inputs.
+
+        Returns:
+        pd.DataFrame: The checkpointed data, or None if there is no checkpoint or the stage is forced.
+        """
+        if stage in self.force_stages:
+            return None
+        base_path = os.path.join(self._stage_dir(stage), self._file_name(step, key))
+        path = next((f"{base_path}{ext}" for ext in ('.parquet', '.pkl') if os.path.exists(f"{base_path}{ext}")), None)
+        if path is None:
+            return None
+        try:
+            df = pd.read_parquet(path) if path.endswith('.parquet') else pd.read_pickle(path)
+            logging.info(f"Resumed '{stage}' from its {step} checkpoint ({len(df)} rows).")
+            return df
+        except Exception as e:
+            logging.error(f"Could not read the {step} checkpoint of '{stage}': {e}")
+            return None
+
+    def metadata(self, stage, step, key):
+        """
+        Returns the metadata stored with a checkpoint.
+
+        Args:
+        stage (str): The pipeline stage.
+        step (str): The step within the stage.
+        key (dict): The step's inputs.
+
+        Returns:
+        dict: The metadata passed to `save`, empty if there is none.
+        """
+        with self._lock:
+            entry = self._load_manifest(stage).get(self._file_name(step, key), {})
+        return entry.get('metadata') or {}
+
+    def save(self, stage, step, key, df, metadata=None):
+        """
+        Writes a checkpoint, replacing any previous one with the same key.
+
+        Args:
+        stage (str): The pipeline stage.
+        step (str): The step within the stage.
+        key (dict): The step's inputs.
+        df (pd.DataFrame): The step's output.
+        metadata (dict): JSON-serializable details to keep with the checkpoint (default None).
+
+        Returns:
+        bool: True if the checkpoint was written, False otherwise.
+        """
+        name = self._file_name(step, key)
+        try:
+            with self._lock:
+                os.makedirs(self._stage_dir(stage), exist_ok=True)
+
+                # Write under a temporary name so a crash never leaves a half-written checkpoint
+                tmp_path = os.path.join(self._stage_dir(stage), f".{name}.tmp")
+                try:
+                    df.to_parquet(tmp_path, index=False)
+                    file_name, stale_name = f"{name}.parquet", f"{name}.pkl"
+                except Exception as e:
+                    # Columns mixing Python types cannot be represented in Arrow; keep them as a pickle
+                    logging.info(f"Checkpointing the {step} of '{stage}' as a pickle because Parquet failed: {e}")
+                    df.to_pickle(tmp_path)
+                    file_name, stale_name = f"{name}.pkl", f"{name}.parquet"
+                os.replace(tmp_path, os.path.join(self._stage_dir(stage), file_name))
+                self._remove_file(os.path.join(self._stage_dir(stage), stale_name))
+
+                manifest = self._load_manifest(stage)
+                manifest[name] = {'step': step, 'key': key, 'file': file_name, 'rows': len(df),
+                                  'created': time.time(), 'metadata': metadata}
+                self._save_manifest(stage, manifest)
+            return True
+
+        except Exception as e:
+            logging.error(f"Could not write the {step} checkpoint of '{stage}': {e}")
+            return False
+
+    def cached(self, stage, step, key, func, *args, **kwargs):
+        """
+        Returns a step's checkpoint if there is one, otherwise runs the step and checkpoints a
+        DataFrame result.
+
+        Args:
+        stage (str): The pipeline stage.
+        step (str): The step within the stage.
+        key (dict): The step's inputs.
+        func (callable): Runs the step.
+        *args, **kwargs: Arguments passed to `func`.
+
+        Returns:
+        The checkpointed or computed result.
+        """
+        df = self.load(stage, step, key)
+        if df is not None:
+            return df
+        result = func(*args, **kwargs)
+        if isinstance(result, pd.DataFrame):
+            self.save(stage, step, key, result)
+        return result
+
+    def clear(self, stage):
+        """
+        Removes all checkpoints of a stage, e.g. once it has been loaded successfully.
+
+        Args:
+        stage (str): The pipeline stage.
+        """
+        with self._lock:
+            paths = [path for ext in ('*.parquet', '*.pkl') for path in glob.glob(os.path.join(self._stage_dir(stage), ext))]
+            for path in paths + [self._manifest_path(stage)]:
+                self._remove_file(path)
+        if paths:
+            logging.info(f"Removed {len(paths)} checkpoints of '{stage}'.")
@@ -1,80 +1,320 @@
+import functools
+import logging
+import multiprocessing
+import os
+import threading
+import numpy as np
 import pandas as pd
-import re
 import uuid
+from concurrent.futures import ProcessPoolExecutor
+from cleaning_kernels import STRING_DTYPE, keep_digits, parse_number, strip_chars
+from date_parsing import parse_dates
+from dedup_index import DedupIndex
+from dtype_optimization import TABLE_SCHEMAS, memory_usage_mb, optimize_dtypes
+from validation import VALIDATION_RULES, evaluate_rules
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+# Columns of the raw orders table that clean_orders_data discards
+ORDERS_DROPPED_COLUMNS = ['level_0', 'index', 'first_name', 'last_name', '1']
+
+# Smallest row partition worth sending to a cleaning worker in clean_orders_data_parallel
+ORDERS_MIN_PARTITION_ROWS = 100000
+
+# Orders frame inherited by forked cleaning workers, which read their partitions from the parent's
+# memory instead of receiving a serialised copy
+_fork_orders = None
+_fork_lock = threading.Lock()
+
+def _map_unique(series, func):
+    """
+    Applies a vectorized conversion to the distinct values of a Series only and maps the results back.
+
+    Args:
+    series (pd.Series): The raw values.
+    func (callable): Converts a Series of distinct values.
+
+    Returns:
+    pd.Series: The converted values aligned with `series`, missing where `series` is missing.
+    """
+    codes, uniques = pd.factorize(series)
+    converted = func(pd.Series(uniques, dtype=object)).reset_index(drop=True)
+    # Missing values are coded as -1, which reindexes to NaN/NaT
+    return pd.Series(converted.reindex(codes).to_numpy(), index=series.index, name=series.name)
+
+
+class _RejectedRows(dict):
+    """
+    Collects the filter counts of a worker process so they can be added to the parent's metrics.
+    """
+
+    def record_rejected(self, step, rows):
+        self[step] = self.get(step, 0) + int(rows)
+
+
+def _to_arrow_ipc(df):
+    """
+    Serialises a DataFrame, with its index, to an Arrow IPC stream.
+
+    Args:
+    df (pd.DataFrame): The data to serialise.
+
+    Returns:
+    pa.Buffer: The IPC stream, or `df` unchanged if Arrow cannot hold its columns (e.g. an object
+        column mixing numbers and strings), in which case it is pickled instead.
+    """
+    try:
+        table = pa.Table.from_pandas(df, preserve_index=True)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        return df
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue()
+
+
+def _from_arrow_ipc(payload, string_dtype=None):
+    """
+    Rebuilds a DataFrame serialised by `_to_arrow_ipc`.
+
+    Args:
+    payload: An Arrow IPC stream, or a DataFrame that could not be serialised.
+    string_dtype: If given, string columns are built with this dtype (e.g. Arrow-backed strings,
+        which needs no conversion) instead of as Python objects.
+
+    Returns:
+    pd.DataFrame: The data.
+    """
+    if isinstance(payload, pd.DataFrame):
+        return payload
+    mapper = {pa.string(): string_dtype, pa.large_string(): string_dtype}.get if string_dtype is not None else None
+    return pa.ipc.open_stream(payload).read_all().to_pandas(types_mapper=mapper)
+
+
+def _clean_orders_partition(source):
+    """
+    Cleans one row partition of the orders in a worker process.
+
+    Args:
+    source: The (start, stop) row positions of the partition in the inherited `_fork_orders` frame,
+        or the partition itself as an Arrow IPC stream when the worker was not forked.
+
+    Returns:
+    tuple: The cleaned partition as an Arrow IPC stream and the rows rejected per filter step.
+    """
+    if isinstance(source, tuple):
+        df = _fork_orders.iloc[source[0]:source[1]]
+    else:
+        df = _from_arrow_ipc(source)
+    rejected = _RejectedRows()
+    cleaned = DataCleaning(metrics=rejected).clean_orders_data(df)
+    return _to_arrow_ipc(cleaned), dict(rejected)
+
+
+def orders_cleaning_executor(max_workers):
+    """
+    Creates a process pool for `clean_orders_data_parallel` that can be reused across chunks, so the
+    workers are started, and import the cleaning code, once per run instead of once per chunk.
+
+    The workers are spawned, as forking from the threaded pipeline could copy locks held by other threads.
+
+    Args:
+    max_workers (int): Number of worker processes.
+
+    Returns:
+    ProcessPoolExecutor: The pool. The caller shuts it down when done.
+    """
+    return ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context('spawn'))
+
+
+def _compacted(table_name):
+    """
+    Decorates a cleaning method with the opt-in dtype optimization stage and memory report.
+
+    Args:
+    table_name (str): The table whose schema in TABLE_SCHEMAS applies to the cleaned output.
+    """
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, df, *args, **kwargs):
+            if self.report_memory:
+                memory_before = memory_usage_mb(df)
+
+            df_cleaned = method(self, df, *args, **kwargs)
+            if self.optimize_dtypes:
+                df_cleaned = optimize_dtypes(df_cleaned, TABLE_SCHEMAS[table_name])
+
+            if self.report_memory:
+                logging.info(f"{method.__name__}: {memory_before:.1f} MB in, {memory_usage_mb(df_cleaned):.1f} MB out "
+                             f"({len(df)} -> {len(df_cleaned)} rows).")
+            return df_cleaned
+        return wrapper
+    return decorator
+
 
 class DataCleaning:
-    def clean_user_data(self, df):
+    def __init__(self, optimize_dtypes=False, report_memory=False, metrics=None, validate_email=False):
         """
-        Cleans user data by handling NULL values, validating data types, and removing invalid entries.
+        Args:
+        optimize_dtypes (bool): Convert the cleaned columns to compact dtypes (categoricals,
+            Arrow-backed strings, downcast numbers) following TABLE_SCHEMAS (default False).
+        report_memory (bool): Log the memory used before and after each clean_* method (default False).
+        metrics (PipelineMetrics): If given, the rows removed by each filter step are recorded on it.
+        validate_email (bool): Drop users whose email address does not match EMAIL_PATTERN (default False).
+        """
+        self.optimize_dtypes = optimize_dtypes
+        self.report_memory = report_memory
+        self.metrics = metrics
+        self.validate_email = validate_email
+
+    def _filtered(self, step, df_before, df_after):
+        """
+        Records the rows removed by a filter step.
 
         Args:
-        df (pd.DataFrame): The user data DataFrame.
+        step (str): The filter step, e.g. 'clean_card_data.non_numeric_card_number'.
+        df_before (pd.DataFrame): The data before the filter.
+        df_after (pd.DataFrame): The data after the filter.
 
         Returns:
-        pd.DataFrame: A cleaned DataFrame.
+        pd.DataFrame: `df_after`, unchanged.
         """
+        if self.metrics is not None:
+            self.metrics.record_rejected(step, len(df_before) - len(df_after))
+        return df_after
 
-        # Step 1: Handle NULL values in critical columns
-        df_cleaned = df.dropna(subset=['first_name', 'last_name', 'email_address', 'join_date', 'date_of_birth'])
+    def _validate(self, method_name, table_name, df, raw=None):
+        """
+        Drops the rows failing any of a table's VALIDATION_RULES with a single filter, and records the
+        rows rejected by each rule as the filter step '<method_name>.<rule name>'.
 
-        # Step 2: Correct date columns
-        df_cleaned['join_date'] = pd.to_datetime(df_cleaned['join_date'], errors='coerce', infer_datetime_format=True, format='mixed')
-        df_cleaned['date_of_birth'] = pd.to_datetime(df_cleaned['date_of_birth'], errors='coerce', infer_datetime_format=True, format='mixed')
+        Args:
+        method_name (str): The cleaning method, e.g. 'clean_card_data'.
+        table_name (str): The table whose rules apply.
+        df (pd.DataFrame): The data after the column conversions.
+        raw (pd.DataFrame): The data as extracted, for the rules marked 'raw' (default None).
 
-        # Step 3: Drop rows where dates are invalid
-        df_cleaned = df_cleaned.dropna(subset=['join_date', 'date_of_birth'])
+        Returns:
+        pd.DataFrame: The valid rows.
+        """
+        skip = () if self.validate_email else ('invalid_email',)
+        keep, rejected = evaluate_rules(df, VALIDATION_RULES[table_name], raw=raw, skip=skip)
+        if self.metrics is not None:
+            for rule, rows in rejected.items():
+                self.metrics.record_rejected(f'{method_name}.{rule}', rows)
+        return df if keep.all() else df[keep]
+
+    def _drop_duplicates(self, df, subset, seen=None):
+        """
+        Drops rows with duplicate keys, keeping the first occurrence.
 
-        # Step 4: Validate email format using regex
-        #df_cleaned = df_cleaned[df_cleaned['email_address'].str.contains(r'^[\w\.-]+@[\w\.-]+\.\w+$', regex=True, na=False)]
+        Args:
+        df (pd.DataFrame): The data.
+        subset (list): The key columns.
+        seen (DedupIndex): If given, keys seen in earlier chunks count as duplicates too, and the
+            keys kept here are added to it.
 
-        # Step 5: Clean phone number by removing non-numeric characters
-        df_cleaned['phone_number'] = df_cleaned['phone_number'].str.replace(r'\D', '', regex=True)
+        Returns:
+        pd.DataFrame: The data without duplicates.
+        """
+        if seen is None:
+            return df.drop_duplicates(subset=subset, keep='first')
+        return seen.drop_duplicates(df, subset)
 
-        # Step 6: Remove duplicates
-        df_cleaned = df_cleaned.drop_duplicates(subset=['email_address', 'user_uuid'], keep='first')
+    def clean_stream(self, clean_method, chunks, max_memory_keys=5_000_000, spill_dir=None):
+        """
+        Cleans a table chunk by chunk with bounded memory, dropping duplicates across chunks as if
+        the whole table had been cleaned at once.
+
+        Args:
+        clean_method (callable): One of clean_user_data, clean_card_data, clean_store_data or
+            clean_products_data, bound to this instance.
+        chunks (iterable): The raw chunks, in source order.
+        max_memory_keys (int): Keys held in memory before the index spills to disk (default 5,000,000).
+        spill_dir (str): Directory for the index's spill file (default the system temporary directory).
+
+        Yields:
+        pd.DataFrame: Each cleaned chunk.
+        """
+        with DedupIndex(max_memory_keys, spill_dir) as seen:
+            for chunk in chunks:
+                yield clean_method(chunk, seen=seen)
+
+    @_compacted('dim_users')
+    def clean_user_data(self, df, seen=None):
+        """
+        Cleans user data by handling NULL values, validating data types, and removing invalid entries.
+
+        Args:
+        df (pd.DataFrame): The user data DataFrame.
+        seen (DedupIndex): Keys kept from earlier chunks of the same table, to drop duplicates across
+            chunks (default None, only within `df`).
+
+        Returns:
+        pd.DataFrame: A cleaned DataFrame.
+        """
+        # Step 1: Correct date columns and clean phone numbers by removing non-numeric characters
+        df_cleaned = df.assign(
+            join_date=parse_dates(df['join_date']),
+            date_of_birth=parse_dates(df['date_of_birth']),
+            phone_number=keep_digits(df['phone_number']),
+        )
+
+        # Step 2: Drop rows with NULL values in critical columns, invalid dates or, with validate_email,
+        # an invalid email format
+        df_cleaned = self._validate('clean_user_data', 'dim_users', df_cleaned, raw=df)
+
+        # Step 3: Remove duplicates
+        df_cleaned = self._filtered('clean_user_data.duplicates', df_cleaned,
+                                    self._drop_duplicates(df_cleaned, ['email_address', 'user_uuid'], seen))
 
         return df_cleaned
 
     
-    def clean_card_data(self, df):
+    @_compacted('dim_card_details')
+    def clean_card_data(self, df, seen=None):
         """
         Cleans card data by handling NULL values, correcting data types, and removing invalid entries.
         
         Args:
         df (pd.DataFrame): The card data DataFrame.
+        seen (DedupIndex): Keys kept from earlier chunks of the same table, to drop duplicates across
+            chunks (default None, only within `df`).
 
         Returns:
         pd.DataFrame: A cleaned DataFrame.
         """
-        # Drop rows with critical missing data
-        df_cleaned = df.dropna(subset=['card_number', 'expiry_date', 'card_provider', 'date_payment_confirmed'])
-
-        # Ensure card numbers are numeric
-        df_cleaned['card_number'] = df_cleaned['card_number'].astype(str).apply(lambda x: x.replace('?', ''))
-        df_cleaned = df_cleaned[df_cleaned['card_number'].str.isnumeric()]
-
-
-        # Convert expiry date and payment date to datetime
-        df_cleaned['expiry_date'] = pd.to_datetime(df_cleaned['expiry_date'], errors='coerce', format='%m/%y')
-        df_cleaned = df_cleaned.dropna(subset=['expiry_date'])
-        df_cleaned['date_payment_confirmed'] = pd.to_datetime(df_cleaned['date_payment_confirmed'], errors='coerce',infer_datetime_format=True,format='mixed')
-        df_cleaned = df_cleaned.dropna(subset=['date_payment_confirmed'])
-
-        # Fill missing card_provider with 'Unknown'
-        df_cleaned['card_provider'] = df_cleaned['card_provider'].fillna('Unknown')
+        # Strip stray characters from card numbers, convert expiry date and payment date to datetime,
+        # and fill missing card_provider with 'Unknown'
+        df_cleaned = df.assign(
+            card_number=strip_chars(df['card_number'], '?'),
+            expiry_date=pd.to_datetime(df['expiry_date'], errors='coerce', format='%m/%y'),
+            date_payment_confirmed=parse_dates(df['date_payment_confirmed']),
+            card_provider=df['card_provider'].fillna('Unknown'),
+        )
+
+        # Drop rows with critical missing data, non-numeric card numbers or invalid dates
+        df_cleaned = self._validate('clean_card_data', 'dim_card_details', df_cleaned, raw=df)
 
         # Remove duplicate card numbers
-        df_cleaned = df_cleaned.drop_duplicates(subset=['card_number'], keep='first')
+        df_cleaned = self._filtered('clean_card_data.duplicates', df_cleaned,
+                                    self._drop_duplicates(df_cleaned, ['card_number'], seen))
 
         return df_cleaned
     
-    def clean_store_data(self, df):
+    @_compacted('dim_store_details')
+    def clean_store_data(self, df, seen=None):
         """
         Cleans store data retrieved from the API by handling NULL values and correcting data types,
         with special handling for 'Web Portal' stores to avoid deleting important records.
 
         Args:
         df (pd.DataFrame): The store data DataFrame.
+        seen (DedupIndex): Keys kept from earlier chunks of the same table, to drop duplicates across
+            chunks (default None, only within `df`).
 
         Returns:
         pd.DataFrame: A cleaned DataFrame.
@@ -82,41 +322,32 @@ class DataCleaning:
         # Drop redundant columns if present
         df_cleaned = df.drop(columns=['index'], errors='ignore')
 
-        # Drop rows with missing critical data
-        df_cleaned = df_cleaned.dropna(subset=['store_code', 'opening_date'], how='any')
-
-        # Convert date and numeric fields to appropriate types
-        df_cleaned['opening_date'] = pd.to_datetime(df_cleaned['opening_date'], errors='coerce', infer_datetime_format=True,format='mixed')
-        
-        # Convert latitude and longitude, but keep 'Web Portal' entries even if these values are missing
-        df_cleaned['latitude'] = df_cleaned['latitude'].astype(str).apply(lambda x: x.replace('?', ''))
-        df_cleaned['longitude'] = df_cleaned['longitude'].astype(str).apply(lambda x: x.replace('?', ''))
-        
-        df_cleaned['latitude'] = pd.to_numeric(df_cleaned['latitude'], errors='coerce')
-        df_cleaned['longitude'] = pd.to_numeric(df_cleaned['longitude'], errors='coerce')
-
-        # Filter out rows where latitude and longitude are missing, but keep 'Web Portal' stores
-        df_cleaned = df_cleaned[
-            (df_cleaned['store_type'] == 'Web Portal') | 
-            (df_cleaned['latitude'].notnull() & df_cleaned['longitude'].notnull())
-        ]
-
-        # Handle missing or invalid staff numbers
-        df_cleaned['staff_numbers'] = df_cleaned['staff_numbers'].astype(str).apply(lambda x: re.sub(r'\D', '', x))
-        df_cleaned['staff_numbers'] = pd.to_numeric(df_cleaned['staff_numbers'], errors='coerce')
-        df_cleaned = df_cleaned[df_cleaned['staff_numbers'] >= 0]
-
-        # Fill missing store type and clean string fields
-        df_cleaned['store_type'] = df_cleaned['store_type'].fillna('Unknown')
-        df_cleaned['country_code'] = df_cleaned['country_code'].str.strip()
-        df_cleaned['continent'] = df_cleaned['continent'].str.strip()
+        # Convert date and numeric fields to appropriate types, fill missing store type and clean string
+        # fields. Missing or invalid staff numbers become NaN.
+        df_cleaned = df_cleaned.assign(
+            opening_date=parse_dates(df_cleaned['opening_date']),
+            latitude=parse_number(df_cleaned['latitude'], '?'),
+            longitude=parse_number(df_cleaned['longitude'], '?'),
+            staff_numbers=parse_number(keep_digits(df_cleaned['staff_numbers'])),
+            store_type=df_cleaned['store_type'].fillna('Unknown'),
+            country_code=df_cleaned['country_code'].str.strip(),
+            continent=df_cleaned['continent'].str.strip(),
+        )
+
+        # Drop rows with missing critical data, missing latitude and longitude (except 'Web Portal'
+        # stores) or invalid staff numbers
+        df_cleaned = self._validate('clean_store_data', 'dim_store_details', df_cleaned, raw=df)
+
+        # The remaining staff numbers were parsed from digits only, so they are whole numbers
+        df_cleaned = df_cleaned.astype({'staff_numbers': 'int64'})
 
         # Fill lat column using latitude if missing
         #if 'lat' in df_cleaned.columns:
         #    df_cleaned['lat'] = df_cleaned['lat'].fillna(df_cleaned['latitude'])
 
         # Remove duplicates based on store_code
-        df_cleaned = df_cleaned.drop_duplicates(subset=['store_code'], keep='first')
+        df_cleaned = self._filtered('clean_store_data.duplicates', df_cleaned,
+                                    self._drop_duplicates(df_cleaned, ['store_code'], seen))
 
         return df_cleaned
 
@@ -141,43 +372,33 @@ class DataCleaning:
             'oz': 0.0283495  # ounces to kilograms
         }
 
-        def convert_weight(value):
-            
-            if pd.isnull(value):
-                return None
-            
-            value = value.strip().lower()
-
-            # Handle cases like "16 x 10g"
-            multi_weight_match = re.match(r"(\d+)\s*x\s*(\d+\.?\d*)\s*(g|kg|ml|l|oz)", value)
-            if multi_weight_match:
-                quantity = int(multi_weight_match.group(1))  # Number of items
-                weight_per_item = float(multi_weight_match.group(2))  # Weight of each item
-                unit = multi_weight_match.group(3)
+        # A single anchored pattern covers both "16 x 10g" multipacks and simple "500g" weights;
+        # the quantity group is empty for simple weights
+        weight_pattern = r"^(?:(\d+)\s*x\s*)?(\d+\.?\d*)\s*(g|kg|ml|l|oz)"
 
-                return quantity * weight_per_item * unit_conversion.get(unit, 1)
+        # Parse each distinct raw string only once and broadcast the results back to the rows
+        codes, uniques = pd.factorize(df['weight'])
+        parts = pd.Series(uniques, dtype=object).str.strip().str.lower().str.extract(weight_pattern)
 
-            # Handle simple cases like "500g", "2kg", "16oz"
-            weight_match = re.match(r"(\d+\.?\d*)\s*(g|kg|ml|l|oz)", value)
-            if weight_match:
-                weight = float(weight_match.group(1))
-                unit = weight_match.group(2)
+        quantity = pd.to_numeric(parts[0]).fillna(1).to_numpy(dtype=float)
+        weight = pd.to_numeric(parts[1]).to_numpy(dtype=float)
+        factor = parts[2].map(unit_conversion).to_numpy(dtype=float)
+        kilograms = quantity * weight * factor
 
-                return weight * unit_conversion.get(unit, 1)
-
-            return None
-
-        # Apply the conversion function to the 'weight' column
-        df['weight'] = df['weight'].apply(convert_weight)
+        # Missing values are coded as -1, which picks the trailing NaN
+        df['weight'] = np.append(kilograms, np.nan)[codes]
 
         return df
     
-    def clean_products_data(self, df):
+    @_compacted('dim_products')
+    def clean_products_data(self, df, seen=None):
         """
         Cleans the product data by handling missing values, correcting data types, and removing erroneous entries.
 
         Args:
         df (pd.DataFrame): The raw product data DataFrame.
+        seen (DedupIndex): Keys kept from earlier chunks of the same table, to drop duplicates across
+            chunks (default None, only within `df`).
 
         Returns:
         pd.DataFrame: The cleaned product data.
@@ -186,35 +407,30 @@ class DataCleaning:
         # Step 1: Drop unnecessary columns
         df_cleaned = df.drop(columns=['Unnamed: 0'], errors='ignore')
 
-        # Step 2: Handle missing values
-        # Drop rows where critical fields are missing: product_name, product_price, category, EAN, date_added, uuid
-        critical_columns = ['product_name', 'product_price', 'category', 'EAN', 'date_added', 'uuid', 'product_code']
-        df_cleaned = df_cleaned.dropna(subset=critical_columns)
-
-        # Step 3: Clean and convert product_price to numeric (removing non-numeric characters, e.g., currency symbols)
-        df_cleaned['product_price'] = df_cleaned['product_price'].replace({'£': '', ',': ''}, regex=True)
-        df_cleaned['product_price'] = pd.to_numeric(df_cleaned['product_price'], errors='coerce')
-
-        # Step 4: Convert 'date_added' to datetime
-        df_cleaned['date_added'] = pd.to_datetime(df_cleaned['date_added'], errors='coerce',infer_datetime_format=True,format='mixed')
-
-        # Step 6: Convert 'removed' column to boolean
-        df_cleaned['removed'] = df_cleaned['removed'].map({'Still_avaliable': True, 'Removed': False})
-
-        # Step 7: Ensure 'weight' is numeric, and handle missing or invalid weights (set to NaN if invalid)
-        df_cleaned['weight'] = pd.to_numeric(df_cleaned['weight'], errors='coerce')
-
-        # Step 8: Remove any remaining rows where critical numeric columns
-        df_cleaned = df_cleaned.dropna(subset=['product_price', 'weight'])
-
-        # Step 9: Drop duplicates based on 'product_code' (keeping the first occurrence)
-        df_cleaned = df_cleaned.drop_duplicates(subset=['product_code'], keep='first')
-
-        # Step 10: Return the cleaned DataFrame
+        # Step 2: Clean and convert product_price to numeric (removing non-numeric characters, e.g., currency symbols),
+        # convert 'date_added' to datetime and the 'removed' column to boolean, and ensure 'weight' is numeric
+        # (set to NaN if invalid)
+        df_cleaned = df_cleaned.assign(
+            product_price=parse_number(df_cleaned['product_price'], '£,'),
+            date_added=parse_dates(df_cleaned['date_added']),
+            removed=df_cleaned['removed'].map({'Still_avaliable': True, 'Removed': False}),
+            weight=pd.to_numeric(df_cleaned['weight'], errors='coerce'),
+        )
+
+        # Step 3: Drop rows where critical fields are missing (product_name, product_price, category, EAN,
+        # date_added, uuid, product_code) or the price or weight could not be parsed
+        df_cleaned = self._validate('clean_products_data', 'dim_products', df_cleaned, raw=df)
+
+        # Step 4: Drop duplicates based on 'product_code' (keeping the first occurrence)
+        df_cleaned = self._filtered('clean_products_data.duplicates', df_cleaned,
+                                    self._drop_duplicates(df_cleaned, ['product_code'], seen))
+
+        # Step 5: Return the cleaned DataFrame
         return df_cleaned
 
         
     
+    @_compacted('orders_table')
     def clean_orders_data(self, df):
         """
         Cleans orders data by removing unnecessary columns and ensuring consistency in data types.
@@ -226,19 +442,16 @@ class DataCleaning:
         pd.DataFrame: The cleaned orders DataFrame.
         """
         # Remove unnecessary columns
-        columns_to_remove = ['level_0', 'index', 'first_name', 'last_name', '1']
-        df_cleaned = df.drop(columns=columns_to_remove, errors='ignore')
+        df_cleaned = df.drop(columns=ORDERS_DROPPED_COLUMNS, errors='ignore')
 
-        # Ensure critical columns are filled
-        critical_columns = ['user_uuid', 'card_number', 'store_code', 'product_code', 'product_quantity']
-        df_cleaned = df_cleaned.dropna(subset=critical_columns)
+        # Convert numeric columns
+        df_cleaned = df_cleaned.assign(
+            card_number=df_cleaned['card_number'].astype(str),
+            product_quantity=pd.to_numeric(df_cleaned['product_quantity'], errors='coerce'),
+        )
 
-        # Convert numeric columns and ensure product quantity is valid
-        df_cleaned['card_number'] = df_cleaned['card_number'].astype(str)
-        df_cleaned = df_cleaned[df_cleaned['card_number'].str.isnumeric()]
-    
-        df_cleaned['product_quantity'] = pd.to_numeric(df_cleaned['product_quantity'], errors='coerce')
-        df_cleaned = df_cleaned[df_cleaned['product_quantity'] >= 0]
+        # Drop rows with missing critical columns, non-numeric card numbers or an invalid product quantity
+        df_cleaned = self._validate('clean_orders_data', 'orders_table', df_cleaned, raw=df)
 
         # Remove duplicates
         # df_cleaned = df_cleaned.drop_duplicates()
@@ -248,6 +461,71 @@ class DataCleaning:
 
         return df_cleaned
 
+    @_compacted('orders_table')
+    def clean_orders_data_parallel(self, df, max_workers=None, min_partition_rows=ORDERS_MIN_PARTITION_ROWS,
+                                   executor=None):
+        """
+        Cleans orders data like `clean_orders_data`, split into row partitions that are cleaned in a
+        process pool and reassembled in their original order.
+
+        When called from a single-threaded process where processes can be forked (Linux), the workers
+        are forked and read their partitions directly from this process's memory. Otherwise, e.g. from
+        a stage of the threaded pipeline, where forking could copy locks held by other threads, the
+        workers are spawned and each partition is sent as an Arrow IPC stream. Spawning costs about a
+        second per worker, so a caller cleaning many chunks should pass a reusable `executor` from
+        `orders_cleaning_executor`, which also receives its partitions as Arrow IPC streams. The cleaned
+        partitions come back as Arrow IPC streams. With optimize_dtypes=True their string columns
+        are rebuilt as Arrow-backed strings without conversion, so reassembly is almost free.
+
+        Inputs too small to give each worker `min_partition_rows` rows, and environments without
+        pyarrow, are cleaned in this process.
+
+        Args:
+        df (pd.DataFrame): The orders DataFrame.
+        max_workers (int): Maximum number of worker processes (default os.cpu_count()).
+        min_partition_rows (int): Minimum number of rows per partition (default ORDERS_MIN_PARTITION_ROWS).
+        executor (ProcessPoolExecutor): A running pool to clean the partitions in, e.g. from
+            `orders_cleaning_executor` (default None, start a pool for this call).
+
+        Returns:
+        pd.DataFrame: The cleaned orders DataFrame.
+        """
+        global _fork_orders
+        partitions = min(max_workers or os.cpu_count() or 1, len(df) // min_partition_rows)
+        if pa is None or partitions < 2:
+            return DataCleaning.clean_orders_data.__wrapped__(self, df)
+
+        bounds = np.linspace(0, len(df), partitions + 1).astype(int)
+        ranges = [(int(start), int(stop)) for start, stop in zip(bounds[:-1], bounds[1:])]
+        forked = executor is None and 'fork' in multiprocessing.get_all_start_methods() and threading.active_count() == 1
+
+        with _fork_lock:
+            if forked:
+                _fork_orders = df
+                sources = ranges
+            else:
+                sources = [_to_arrow_ipc(df.iloc[start:stop].drop(columns=ORDERS_DROPPED_COLUMNS, errors='ignore'))
+                           for start, stop in ranges]
+            try:
+                if executor is not None:
+                    results = list(executor.map(_clean_orders_partition, sources))
+                else:
+                    context = multiprocessing.get_context('fork' if forked else 'spawn')
+                    with ProcessPoolExecutor(max_workers=partitions, mp_context=context) as pool:
+                        results = list(pool.map(_clean_orders_partition, sources))
+            finally:
+                _fork_orders = None
+
+        string_dtype = STRING_DTYPE if self.optimize_dtypes else None
+        cleaned_parts = []
+        for payload, rejected in results:
+            cleaned_parts.append(_from_arrow_ipc(payload, string_dtype))
+            for step, rows in rejected.items():
+                if self.metrics is not None:
+                    self.metrics.record_rejected(step, rows)
+        return pd.concat(cleaned_parts)
+
+    @_compacted('dim_date_times')
     def clean_date_data(self, df):
         """
         Cleans the date data by reshaping, converting data types, and handling missing values.
@@ -258,25 +536,27 @@ class DataCleaning:
         Returns:
         pd.DataFrame: The cleaned date data DataFrame.
         """
-        # Step 1: Convert 'timestamp' into a proper datetime object by combining it with day, month, and year.
-        df['timestamp'] = pd.to_datetime(df[['year', 'month', 'day']].astype(str).agg('-'.join, axis=1) + ' ' + df['timestamp'], errors='coerce')
-        
-        # Step 2: Ensure 'month', 'year', and 'day' are numeric values
-        df['month'] = pd.to_numeric(df['month'], errors='coerce')
-        df['year'] = pd.to_numeric(df['year'], errors='coerce')
-        df['day'] = pd.to_numeric(df['day'], errors='coerce')
-        
-        # Step 3: Handle missing or invalid timestamp (drop rows where timestamp conversion failed)
-        df_cleaned = df.dropna(subset=['timestamp'])
+        # Step 1: Ensure 'month', 'year', and 'day' are numeric values
+        year = _map_unique(df['year'], lambda values: pd.to_numeric(values, errors='coerce'))
+        month = _map_unique(df['month'], lambda values: pd.to_numeric(values, errors='coerce'))
+        day = _map_unique(df['day'], lambda values: pd.to_numeric(values, errors='coerce'))
+
+        # Step 2: Build the 'timestamp' from the date components plus the time of day, without string joins.
+        # Fractional components are not valid dates, and the time of day must be a strict HH:MM:SS.
+        components = pd.DataFrame({'year': year, 'month': month, 'day': day})
+        dates = pd.to_datetime(components.where(components % 1 == 0), errors='coerce')
+        time_of_day = _map_unique(df['timestamp'], lambda values: pd.to_datetime(values, format='%H:%M:%S', errors='coerce') - pd.Timestamp('1900-01-01'))
+
+        # Assign into a new frame so the caller's DataFrame is left untouched. Missing values for 'time_period'
+        # are filled with 'Unknown', and 'date_uuid' is treated as a proper string.
+        df_cleaned = df.assign(timestamp=dates + time_of_day, month=month, year=year, day=day,
+                               time_period=df['time_period'].fillna('Unknown'), date_uuid=df['date_uuid'].astype(str))
 
-        # Step 4: Check and handle missing values for 'time_period' (if any), fill with 'Unknown' if needed
-        df_cleaned['time_period'] = df_cleaned['time_period'].fillna('Unknown')
-
-        # Step 5: Ensure 'date_uuid' is treated as a proper string
-        df_cleaned['date_uuid'] = df_cleaned['date_uuid'].astype(str)
+        # Step 3: Handle missing or invalid timestamp (drop rows where timestamp conversion failed)
+        df_cleaned = self._validate('clean_date_data', 'dim_date_times', df_cleaned)
 
-        # Step 6: Drop unnecessary columns if any exist
-        df_cleaned.reset_index(drop=True, inplace=True)
+        # Step 4: Drop unnecessary columns if any exist
+        df_cleaned = df_cleaned.reset_index(drop=True)
 
         # Return the cleaned DataFrame
         return df_cleaned
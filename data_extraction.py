@@ -1,15 +1,85 @@
 import pandas as pd
+from sqlalchemy import column, literal_column, select, table
 from sqlalchemy.exc import SQLAlchemyError
+from source_cache import conditional_headers, http_validator
 import tabula
 import requests
+from requests.adapters import HTTPAdapter
 import boto3
-from io import StringIO
+from botocore.exceptions import ClientError
+import io
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from multiprocessing import get_context
+import os
+import random
+import re
+import tempfile
 import time
 
 
+def _extract_pdf_pages(path, first_page, last_page):
+    """
+    Extracts the tables on a range of pages of a local PDF.
+
+    Runs in a worker process; tabula starts a JVM for each worker.
+
+    Args:
+    path (str): Path of the downloaded PDF.
+    first_page (int): First page of the shard (1-based).
+    last_page (int): Last page of the shard (inclusive).
+
+    Returns:
+    list: The DataFrames found on these pages, in page order.
+    """
+    return tabula.read_pdf(path, pages=f"{first_page}-{last_page}", multiple_tables=True)
+
+
+def _count_pdf_pages(path):
+    """
+    Counts the pages of a PDF, using pypdf when it is installed.
+
+    Without pypdf the page objects are counted in the raw file, which works for PDFs
+    that do not hide their page objects inside compressed object streams.
+
+    Args:
+    path (str): Path of the PDF.
+
+    Returns:
+    int: The number of pages, or 0 if none could be found.
+    """
+    try:
+        from pypdf import PdfReader
+        return len(PdfReader(path).pages)
+    except ImportError:
+        with open(path, 'rb') as f:
+            return len(re.findall(rb"/Type\s*/Page\b", f.read()))
+
+
+class _BufferReader(io.RawIOBase):
+    """
+    Read-only file object over an in-memory buffer that hands data to the CSV parser without copying the buffer.
+    """
+
+    def __init__(self, buffer):
+        self._view = memoryview(buffer)
+        self._position = 0
+
+    def readable(self):
+        return True
+
+    def readinto(self, target):
+        size = min(len(target), len(self._view) - self._position)
+        target[:size] = self._view[self._position:self._position + size]
+        self._position += size
+        return size
+
+
 class DataExtractor:
-    def __init__(self, engine=None):
+    def __init__(self, engine=None, watermark_store=None, cache=None):
         self.engine = engine
+        self.watermark_store = watermark_store
+        self.cache = cache
+        self.failed_stores = []
 
     def read_table_data(self, table_name):
         """
@@ -30,6 +100,76 @@ class DataExtractor:
             print(f"Unexpected error occurred: {e}")
         return None
 
+    def stream_table_data(self, table_name, chunksize=50000, columns=None, watermark_column=None, watermark=None):
+        """
+        Streams data from the specified table in chunks using a server-side cursor.
+
+        Rows are fetched from the database as the generator is consumed, so peak memory is bounded
+        by the chunk size rather than the size of the table.
+
+        Args:
+        table_name (str): The name of the database table.
+        chunksize (int): Number of rows per yielded DataFrame (default 50000).
+        columns (list): Optional list of column names to select. Defaults to all columns.
+        watermark_column (str): Optional monotonic column; rows are returned in its order.
+        watermark: If given with `watermark_column`, only rows with a greater value are returned.
+
+        Yields:
+        pd.DataFrame: DataFrames of at most `chunksize` rows.
+
+        Raises:
+        Exception: Errors while querying or fetching are logged and re-raised, so a stream that fails
+            part-way is not mistaken for the end of the table.
+        """
+        projection = [column(name) for name in columns] if columns else [literal_column('*')]
+        query = select(*projection).select_from(table(table_name))
+        if watermark_column is not None:
+            if watermark is not None:
+                query = query.where(column(watermark_column) > watermark)
+            query = query.order_by(column(watermark_column))
+        try:
+            with self.engine.connect() as connection:
+                connection = connection.execution_options(stream_results=True, max_row_buffer=chunksize)
+                yield from pd.read_sql(query, connection, chunksize=chunksize)
+        except SQLAlchemyError as e:
+            print(f"SQLAlchemyError while streaming data from table {table_name}: {e}")
+            raise
+        except Exception as e:
+            print(f"Unexpected error occurred: {e}")
+            raise
+
+    def read_incremental_table_data(self, table_name, watermark_column):
+        """
+        Reads only the rows added since the last successful load, using the watermark stored for the table.
+
+        The watermark is not advanced here; call `self.watermark_store.advance(table_name, new_watermark)`
+        once the extracted rows have been loaded.
+
+        Args:
+        table_name (str): The name of the database table.
+        watermark_column (str): A monotonically increasing column, e.g. 'index'.
+
+        Returns:
+        tuple: A DataFrame with the new rows (or None if an error occurs) and the new watermark,
+            which is the previous watermark if there are no new rows.
+        """
+        watermark = self.watermark_store.get(table_name) if self.watermark_store else None
+        try:
+            query = select(literal_column('*')).select_from(table(table_name)).order_by(column(watermark_column))
+            if watermark is not None:
+                query = query.where(column(watermark_column) > watermark)
+            df = pd.read_sql(query, self.engine)
+        except SQLAlchemyError as e:
+            print(f"SQLAlchemyError while reading data from table {table_name}: {e}")
+            return None, watermark
+        except Exception as e:
+            print(f"Unexpected error occurred: {e}")
+            return None, watermark
+
+        print(f"Extracted {len(df)} new rows from {table_name} past watermark {watermark}.")
+        new_watermark = df[watermark_column].max() if not df.empty else watermark
+        return df, new_watermark
+
     def read_rds_table(self, db_connector, table_name):
         """
         Reads the data from a specified table via a DatabaseConnector instance.
@@ -55,17 +195,95 @@ class DataExtractor:
         """
         Extracts table data from a PDF.
 
+        If a cache is configured, a HEAD request checks whether the PDF changed and the
+        cached tables are returned without downloading or parsing it again.
+
         Args:
         link (str): URL of the PDF.
 
         Returns:
         pd.DataFrame: A DataFrame containing the extracted data, or None if an error occurs.
         """
+        validator = None
+        if self.cache:
+            try:
+                response = requests.head(link, allow_redirects=True)
+                response.raise_for_status()
+                validator = http_validator(response.headers)
+                cached_df = self.cache.load(link, validator) if validator else None
+                if cached_df is not None:
+                    return cached_df
+            except requests.exceptions.RequestException as e:
+                print(f"Error checking PDF freshness, extracting it again: {e}")
+
         try:
             dfs = tabula.read_pdf(link, pages='all', multiple_tables=True)
-            return pd.concat(dfs, ignore_index=True) if len(dfs) > 1 else dfs[0]
+            df = pd.concat(dfs, ignore_index=True) if len(dfs) > 1 else dfs[0]
+            if self.cache:
+                self.cache.store(link, validator, df)
+            return df
+        except Exception as e:
+            print(f"Error extracting data from PDF: {e}")
+        return None
+
+    def read_pdf_data_parallel(self, link, page_range=None, max_workers=4):
+        """
+        Extracts table data from a PDF by splitting its pages into shards that are parsed in parallel.
+
+        The PDF is downloaded once and each worker process extracts a contiguous page range with its
+        own JVM, so the speedup only pays off for PDFs with many pages. Tables are concatenated in page
+        order. If the pages cannot be counted, the whole PDF is extracted in a single tabula call.
+
+        Args:
+        link (str): URL of the PDF.
+        page_range (tuple): Optional (first_page, last_page), 1-based and inclusive, to extract
+            only these pages. Defaults to all pages.
+        max_workers (int): Number of worker processes and shards (default 4).
+
+        Returns:
+        pd.DataFrame: A DataFrame containing the extracted data, or None if an error occurs.
+        """
+        use_cache = self.cache is not None and page_range is None
+        validator = self.cache.validator(link) if use_cache else None
+        pdf_path = None
+        try:
+            response = requests.get(link, headers=conditional_headers(validator), stream=True)
+            if response.status_code == 304:
+                cached_df = self.cache.load(link, validator)
+                if cached_df is not None:
+                    return cached_df
+                response = requests.get(link, stream=True)
+            response.raise_for_status()
+
+            with tempfile.NamedTemporaryFile(suffix='.pdf', delete=False) as f:
+                pdf_path = f.name
+                for chunk in response.iter_content(chunk_size=1024 ** 2):
+                    f.write(chunk)
+
+            first_page, last_page = page_range or (1, _count_pdf_pages(pdf_path))
+            if page_range is None and last_page == 0:
+                # The page count is unknown (e.g. pages hidden in compressed object streams), so there is nothing to shard
+                dfs = tabula.read_pdf(pdf_path, pages='all', multiple_tables=True)
+            else:
+                shard_size = -(-(last_page - first_page + 1) // max_workers)
+                shards = [(start, min(start + shard_size - 1, last_page))
+                          for start in range(first_page, last_page + 1, shard_size)]
+
+                # Spawned workers do not inherit the caller's threads or locks, e.g. when a threaded pipeline calls this
+                with ProcessPoolExecutor(max_workers=max_workers, mp_context=get_context('spawn')) as executor:
+                    futures = [executor.submit(_extract_pdf_pages, pdf_path, start, end) for start, end in shards]
+                    # Collect in submission order so the tables stay in page order
+                    dfs = [df for future in futures for df in future.result()]
+
+            df = pd.concat(dfs, ignore_index=True) if dfs else pd.DataFrame()
+            if use_cache:
+                self.cache.store(link, http_validator(response.headers), df)
+            return df
         except Exception as e:
             print(f"Error extracting data from PDF: {e}")
+        finally:
+            if pdf_path is not None:
+                os.remove(pdf_path)
         return None
 
     def list_number_of_stores(self, endpoint_url, headers):
@@ -131,31 +349,168 @@ class DataExtractor:
         # Return the collected store data as a DataFrame or None if no data could be retrieved
         return pd.DataFrame(stores_data) if stores_data else None
 
-    def extract_from_s3(self, s3_address):
+    def retrieve_stores_data_concurrent(self, store_endpoint_url, number_of_stores, headers=None, max_workers=16,
+                                        max_retries=3, backoff=0.5, max_backoff=8, store_numbers=None, timeout=10):
+        """
+        Fetches store details concurrently using a bounded thread pool and a shared keep-alive session.
+
+        Each store is retried independently with exponential backoff and jitter, so a slow or failing
+        store only delays its own worker. A request that hangs past `timeout` is retried like any
+        other failed request. Store numbers that still fail after all retries are stored in
+        `self.failed_stores`.
+
+        Args:
+        store_endpoint_url (str): API endpoint template to fetch store details (uses '{store_number}' as a placeholder).
+        number_of_stores (int): Number of stores to retrieve data for.
+        headers (dict): Optional headers for the API request.
+        max_workers (int): Maximum number of concurrent requests (default 16).
+        max_retries (int): Number of attempts per store before giving up (default 3).
+        backoff (float): Base delay in seconds for the exponential backoff (default 0.5 seconds).
+        max_backoff (float): Upper bound in seconds for a single backoff delay (default 8 seconds).
+        store_numbers (iterable): Only fetch these stores, e.g. the failed stores of an earlier run
+            (default all stores below `number_of_stores`).
+        timeout (float or tuple): Seconds to wait for the connection and for each read of a response,
+            or a (connect, read) pair (default 10 seconds).
+
+        Returns:
+        pd.DataFrame: DataFrame containing store details in store order, or None if no stores could be retrieved.
+        """
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_workers)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        if headers:
+            session.headers.update(headers)
+
+        def fetch_store(store_number):
+            store_url = store_endpoint_url.format(store_number=store_number)
+            for attempt in range(1, max_retries + 1):
+                try:
+                    response = session.get(store_url, timeout=timeout)
+                    response.raise_for_status()
+                    return response.json()
+                # requests.exceptions.Timeout is a RequestException, so a hung store is retried too
+                except (requests.exceptions.RequestException, ValueError) as e:
+                    print(f"Error retrieving store {store_number} (Attempt {attempt}/{max_retries}): {e}")
+                    if attempt < max_retries:
+                        # Full jitter keeps retries from many workers from hitting the API in lockstep
+                        time.sleep(random.uniform(0, min(max_backoff, backoff * 2 ** (attempt - 1))))
+            return None
+
+        with session, ThreadPoolExecutor(max_workers=max_workers) as executor:
+            # executor.map yields results in submission order, i.e. store order
+            store_numbers = list(range(number_of_stores) if store_numbers is None else store_numbers)
+            results = list(executor.map(fetch_store, store_numbers))
+
+        self.failed_stores = [store_number for store_number, data in zip(store_numbers, results) if data is None]
+        if self.failed_stores:
+            print(f"Failed to retrieve {len(self.failed_stores)} stores: {self.failed_stores}")
+
+        stores_data = [data for data in results if data is not None]
+        return pd.DataFrame(stores_data) if stores_data else None
+
+    def extract_from_s3(self, s3_address, chunksize=None, part_size=16 * 1024 ** 2, max_workers=8):
         """
         Extracts a CSV file from the specified S3 address.
 
+        The S3 body is fed straight into the CSV parser without decoding it to an intermediate string.
+        Objects larger than `part_size` are downloaded as parallel ranged GETs into one preallocated buffer.
+        If a cache is configured, the object is requested conditionally on its cached ETag
+        and the cached DataFrame is returned when S3 reports it unchanged.
+
         Args:
         s3_address (str): S3 URL for the CSV file.
+        chunksize (int): If given, stream the object and return an iterator of DataFrames with
+            this many rows instead of a single DataFrame. The cache is not used in this mode.
+        part_size (int): Size in bytes of each ranged GET (default 16 MiB).
+        max_workers (int): Maximum number of concurrent ranged GETs (default 8).
 
         Returns:
-        pd.DataFrame: DataFrame containing the extracted CSV data.
+        pd.DataFrame: DataFrame containing the extracted CSV data (or an iterator of DataFrames if
+            `chunksize` is given), or None if an error occurs.
         """
         try:
             s3_parts = s3_address.replace("s3://", "").split("/", 1)
             bucket_name, file_key = s3_parts
             s3 = boto3.client('s3')
-            s3_object = s3.get_object(Bucket=bucket_name, Key=file_key)
-            file_content = s3_object['Body'].read().decode('utf-8')
-            return pd.read_csv(StringIO(file_content))
+
+            if chunksize:
+                s3_object = s3.get_object(Bucket=bucket_name, Key=file_key)
+                return pd.read_csv(s3_object['Body'], chunksize=chunksize)
+
+            validator = self.cache.validator(s3_address) if self.cache else None
+            request = {'Bucket': bucket_name, 'Key': file_key, 'Range': f'bytes=0-{part_size - 1}'}
+            if validator and validator.get('etag'):
+                request['IfNoneMatch'] = validator['etag']
+            try:
+                # The first part also tells us the object's total size
+                s3_object = s3.get_object(**request)
+            except ClientError as e:
+                cached_df = self.cache.load(s3_address, validator) if e.response['Error']['Code'] == '304' else None
+                if cached_df is None:
+                    raise
+                return cached_df
+
+            total_size = int(s3_object['ContentRange'].rsplit('/', 1)[1])
+            if total_size <= part_size:
+                df = pd.read_csv(s3_object['Body'])
+            else:
+                buffer = self._download_s3_ranges(s3, bucket_name, file_key, s3_object, total_size, part_size, max_workers)
+                df = pd.read_csv(_BufferReader(buffer))
+
+            if self.cache:
+                self.cache.store(s3_address, {'etag': s3_object['ETag']}, df)
+            return df
         except Exception as e:
             print(f"Error downloading file from S3: {e}")
         return None
 
+    def _download_s3_ranges(self, s3, bucket_name, file_key, first_part, total_size, part_size, max_workers):
+        """
+        Downloads an S3 object into a preallocated buffer with parallel ranged GETs.
+
+        Args:
+        s3 (S3.Client): The boto3 S3 client.
+        bucket_name (str): The bucket name.
+        file_key (str): The object key.
+        first_part (dict): The already requested get_object response for the first part.
+        total_size (int): The object size in bytes.
+        part_size (int): Size in bytes of each ranged GET.
+        max_workers (int): Maximum number of concurrent ranged GETs.
+
+        Returns:
+        bytearray: The complete object.
+        """
+        buffer = bytearray(total_size)
+        view = memoryview(buffer)
+
+        def read_into(body, offset):
+            while True:
+                chunk = body.read(1024 ** 2)
+                if not chunk:
+                    return
+                view[offset:offset + len(chunk)] = chunk
+                offset += len(chunk)
+
+        def fetch_part(offset):
+            end = min(offset + part_size, total_size) - 1
+            # IfMatch guarantees every part comes from the same version of the object
+            part = s3.get_object(Bucket=bucket_name, Key=file_key, Range=f'bytes={offset}-{end}', IfMatch=first_part['ETag'])
+            read_into(part['Body'], offset)
+
+        read_into(first_part['Body'], 0)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            # list() surfaces any exception raised by a part
+            list(executor.map(fetch_part, range(part_size, total_size, part_size)))
+        return buffer
+
     def extract_json_from_s3(self, url):
         """
         Downloads JSON data from a URL and returns it as a reshaped Pandas DataFrame.
 
+        If a cache is configured, the request is conditional on the cached validator and the
+        cached DataFrame is returned when the server answers 304 Not Modified.
+
         Args:
         url (str): URL of the JSON file.
 
@@ -163,12 +518,20 @@ class DataExtractor:
         pd.DataFrame: A DataFrame containing the JSON data, or None if an error occurs.
         """
         try:
-            response = requests.get(url)
+            validator = self.cache.validator(url) if self.cache else None
+            response = requests.get(url, headers=conditional_headers(validator))
+            if response.status_code == 304:
+                cached_df = self.cache.load(url, validator)
+                if cached_df is not None:
+                    return cached_df
+                response = requests.get(url)
             response.raise_for_status()
             json_data = response.json()  # Get the raw JSON data
             
             # Convert the nested dictionary to a DataFrame
             df = pd.DataFrame.from_dict(json_data)
+            if self.cache:
+                self.cache.store(url, http_validator(response.headers), df)
             
             return df
         except requests.exceptions.RequestException as e:
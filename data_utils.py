@@ -1,12 +1,161 @@
 import os
+import csv
+import time
 import yaml
+import atexit
 import logging
-from sqlalchemy import create_engine, inspect
+import threading
+import uuid
+from io import StringIO
+from sqlalchemy import create_engine, inspect, text
 from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.pool import QueuePool
+from schema import NATURAL_KEYS, add_constraints, conform_frame, create_table, widen_columns
 
 # Setup logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
+# PostgreSQL drivers whose cursors support COPY FROM STDIN; other drivers load with multi-row INSERTs
+COPY_DRIVERS = ('psycopg2', 'psycopg')
+
+
+def copy_from_stdin(table, conn, keys, data_iter):
+    """
+    pandas `to_sql` insertion method that loads each chunk with PostgreSQL `COPY ... FROM STDIN`.
+
+    Only the current chunk is serialised to CSV, so memory stays bounded by the `chunksize`
+    passed to `to_sql` rather than the size of the DataFrame.
+
+    Args:
+    table (pandas.io.sql.SQLTable): The target table.
+    conn (Connection): SQLAlchemy connection bound to a psycopg2 or psycopg (3) DBAPI connection.
+    keys (list): Column names of the chunk.
+    data_iter (iterable): Rows of the chunk, with missing values as None.
+    """
+    buffer = StringIO()
+    writer = csv.writer(buffer)
+    for row in data_iter:
+        writer.writerow(['\\N' if value is None else value for value in row])
+    buffer.seek(0)
+
+    columns = ', '.join(f'"{key}"' for key in keys)
+    table_name = f'"{table.schema}"."{table.name}"' if table.schema else f'"{table.name}"'
+    sql = f"COPY {table_name} ({columns}) FROM STDIN WITH (FORMAT csv, NULL '\\N')"
+    with conn.connection.cursor() as cursor:
+        if conn.dialect.driver == 'psycopg2':
+            cursor.copy_expert(sql, buffer)
+        else:
+            # psycopg 3 replaced copy_expert with a context manager that data is written into
+            with cursor.copy(sql) as copy:
+                copy.write(buffer.getvalue())
+
+
+class TimedQueuePool(QueuePool):
+    """
+    QueuePool that counts checkouts and the time callers spend waiting for a connection.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._stats_lock = threading.Lock()
+        self.checkouts = 0
+        self.wait_time = 0.0
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            with self._stats_lock:
+                self.checkouts += 1
+                self.wait_time += time.perf_counter() - start
+
+
+class EngineRegistry:
+    """
+    Process-wide registry of SQLAlchemy engines keyed by credential file.
+
+    Credentials are parsed and the engine is created once per file; every DatabaseConnector,
+    stage and thread that asks for the same file shares its connection pool.
+    """
+
+    def __init__(self, pool_size=5, max_overflow=10, pool_pre_ping=True, pool_recycle=1800):
+        self.pool_options = {
+            'pool_size': pool_size,
+            'max_overflow': max_overflow,
+            'pool_pre_ping': pool_pre_ping,
+            'pool_recycle': pool_recycle,
+        }
+        self._engines = {}
+        self._lock = threading.RLock()
+
+    def configure(self, **pool_options):
+        """
+        Updates the pool options used for engines created from now on.
+
+        Args:
+        **pool_options: Any of pool_size, max_overflow, pool_pre_ping and pool_recycle.
+        """
+        self.pool_options.update(pool_options)
+
+    def get_or_create(self, filename, factory):
+        """
+        Returns the engine registered for a credential file, creating it with `factory` if needed.
+
+        Args:
+        filename (str): The path to the YAML credential file.
+        factory (callable): Called with the pool options to create the engine. May return None.
+
+        Returns:
+        Engine: The shared engine, or None if it could not be created.
+        """
+        key = os.path.abspath(filename)
+        with self._lock:
+            if key not in self._engines:
+                engine = factory(**self.pool_options)
+                if engine is None:
+                    return None
+                self._engines[key] = engine
+            return self._engines[key]
+
+    def pool_stats(self):
+        """
+        Reports connection pool statistics for every registered engine.
+
+        Returns:
+        dict: Per credential file, the pool size, checked-out connections, overflow,
+            total checkouts and total seconds spent waiting for a connection.
+        """
+        with self._lock:
+            engines = dict(self._engines)
+
+        stats = {}
+        for key, engine in engines.items():
+            pool = engine.pool
+            stats[key] = {
+                'size': pool.size(),
+                'checked_out': pool.checkedout(),
+                'overflow': pool.overflow(),
+                'checkouts': getattr(pool, 'checkouts', None),
+                'wait_time': getattr(pool, 'wait_time', None),
+            }
+        return stats
+
+    def dispose_all(self):
+        """
+        Disposes every registered engine and closes its pooled connections.
+        """
+        with self._lock:
+            for key, engine in self._engines.items():
+                engine.dispose()
+                logging.info(f"Disposed database engine for '{key}'.")
+            self._engines.clear()
+
+
+engine_registry = EngineRegistry()
+atexit.register(engine_registry.dispose_all)
+
+
 class DatabaseConnector:
     def __init__(self):
         self.engine = None  # Initialize the engine as None
@@ -47,9 +196,29 @@ class DatabaseConnector:
         """
         Initializes the SQLAlchemy engine based on the credentials from the provided YAML file.
 
+        Engines are shared through `engine_registry`, so the credentials are read and the
+        connection is tested only the first time a given file is used in the process.
+
         Args:
         filename (str): The path to the YAML file containing the credentials.
 
+        Returns:
+        Engine: The SQLAlchemy engine instance or None in case of an error.
+        """
+        def factory(**pool_options):
+            return self._create_engine(filename, **pool_options)
+
+        self.engine = engine_registry.get_or_create(filename, factory)
+        return self.engine
+
+    def _create_engine(self, filename, **pool_options):
+        """
+        Creates a pooled SQLAlchemy engine from the credentials in the provided YAML file.
+
+        Args:
+        filename (str): The path to the YAML file containing the credentials.
+        **pool_options: Connection pool settings passed to `create_engine`.
+
         Returns:
         Engine: The SQLAlchemy engine instance or None in case of an error.
         """
@@ -68,13 +237,13 @@ class DatabaseConnector:
             db_url = f"postgresql://{creds['RDS_USER']}:{creds['RDS_PASSWORD']}@{creds['RDS_HOST']}:{creds['RDS_PORT']}/{creds['RDS_DATABASE']}"
             
             # Create the SQLAlchemy engine
-            self.engine = create_engine(db_url)
+            engine = create_engine(db_url, poolclass=TimedQueuePool, **pool_options)
             
             # Test the connection
-            with self.engine.connect() as connection:
+            with engine.connect() as connection:
                 logging.info("Database connection successfully initialized.")
             
-            return self.engine
+            return engine
         
         except SQLAlchemyError as e:
             logging.error(f"Error initializing database engine: {e}")
@@ -117,14 +286,35 @@ class DatabaseConnector:
         
         return None
     
-    def upload_to_db(self, df, table_name, engine=None):
+    def upload_to_db(self, df, table_name, engine=None, method='copy', chunksize=10000, mode='append', key=None,
+                     constraints=True):
         """
         Uploads a Pandas DataFrame to the specified table in the database.
 
+        With method='copy' the data is bulk-loaded with PostgreSQL `COPY ... FROM STDIN` in chunks,
+        if the engine uses one of the COPY_DRIVERS (psycopg2 or psycopg 3). SQLite falls back to
+        executemany INSERTs, which it runs much faster than multi-row INSERTs, and other engines and
+        drivers to batched multi-row INSERTs.
+
+        A missing table is first created with its final column types (see schema.COLUMN_TYPES), sized
+        from the data, and its keys and indexes are added once the data is loaded. VARCHAR columns of
+        an existing table are widened if the new data has longer values.
+
+        With mode='merge' the data is bulk-loaded into a staging table and merged into the target with
+        a single `INSERT ... ON CONFLICT (key) DO UPDATE`, so reruns update rows instead of duplicating them.
+
         Args:
         df (pd.DataFrame): The data to upload.
         table_name (str): The name of the table to upload the data to.
         engine (Engine): The SQLAlchemy engine. If not provided, defaults to the instance's engine.
+        method (str): 'copy' for bulk loading, 'multi' for batched multi-row INSERTs or None for
+            pandas' default row-by-row INSERTs (default 'copy').
+        chunksize (int): Number of rows sent per COPY or INSERT batch (default 10000).
+        mode (str): 'append' to insert all rows or 'merge' to upsert on the key (default 'append').
+        key (str): Key column for mode='merge'. Defaults to the table's entry in NATURAL_KEYS.
+        constraints (bool): Add the keys and indexes after loading into a newly created table. Pass False
+            when loading a table in several batches and call schema.add_constraints after the last one
+            (default True).
 
         Returns:
         bool: True if upload is successful, False otherwise.
@@ -134,16 +324,92 @@ class DatabaseConnector:
         if engine is None:
             logging.error("No engine provided or initialized for uploading.")
             return False
-        
+
+        if mode not in ('append', 'merge'):
+            logging.error(f"Unknown upload mode '{mode}'. Expected 'append' or 'merge'.")
+            return False
+
+        if mode == 'merge':
+            key = key or NATURAL_KEYS.get(table_name)
+            if key is None:
+                logging.error(f"No merge key given or known for table '{table_name}'.")
+                return False
+
+        if method == 'copy':
+            if engine.dialect.name == 'postgresql' and engine.dialect.driver in COPY_DRIVERS:
+                method = copy_from_stdin
+            else:
+                method = None if engine.dialect.name == 'sqlite' else 'multi'
+
+        if method == 'multi' and engine.dialect.name == 'sqlite':
+            # SQLite caps the number of bound parameters per statement (999 on older builds)
+            chunksize = min(chunksize, max(1, 999 // max(1, len(df.columns))))
+
         try:
             # Upload DataFrame to the specified table
-            df.to_sql(table_name, con=engine, if_exists='append', index=False)
-            logging.info(f"Data successfully uploaded to the '{table_name}' table.")
+            start = time.perf_counter()
+            df = conform_frame(df, table_name)
+            created = not inspect(engine).has_table(table_name)
+            if created:
+                create_table(df, table_name, engine)
+            else:
+                widen_columns(df, table_name, engine)
+
+            if mode == 'merge' and not created:
+                self._merge_into(df, table_name, engine, key, method, chunksize)
+            else:
+                df.to_sql(table_name, con=engine, if_exists='append', index=False, method=method, chunksize=chunksize)
+
+            if created and constraints:
+                add_constraints(table_name, engine)
+            elapsed = time.perf_counter() - start
+
+            rows_per_second = len(df) / elapsed if elapsed > 0 else float('inf')
+            logging.info(f"Data successfully uploaded to the '{table_name}' table "
+                         f"({len(df)} rows in {elapsed:.2f}s, {rows_per_second:,.0f} rows/s).")
             return True
-        
+
         except SQLAlchemyError as e:
             logging.error(f"Error while uploading data to table '{table_name}': {e}")
         except Exception as e:
             logging.error(f"An unexpected error occurred: {e}")
-        
+
         return False
+
+    def _merge_into(self, df, table_name, engine, key, method, chunksize):
+        """
+        Bulk-loads a DataFrame into a staging table and upserts it into the target table in one statement.
+
+        The whole merge runs in a single transaction, so a failure leaves the target untouched.
+        The target needs a primary key or unique constraint on the key column.
+
+        Args:
+        df (pd.DataFrame): The data to merge.
+        table_name (str): The target table.
+        engine (Engine): The SQLAlchemy engine.
+        key (str): The key column to match rows on.
+        method: The to_sql insertion method used to fill the staging table.
+        chunksize (int): Number of rows per staging batch.
+        """
+        # ON CONFLICT rejects a key repeated within one statement, so keep only the last row of each key,
+        # the same row a sequence of single-row upserts would leave behind
+        df = df.drop_duplicates(subset=[key], keep='last')
+
+        staging_table = f"{table_name}_staging_{uuid.uuid4().hex[:8]}"
+        columns = ', '.join(f'"{name}"' for name in df.columns)
+        updates = ', '.join(f'"{name}" = EXCLUDED."{name}"' for name in df.columns if name != key)
+        on_conflict = f'DO UPDATE SET {updates}' if updates else 'DO NOTHING'
+
+        with engine.begin() as connection:
+            if engine.dialect.name == 'postgresql':
+                # An unlogged copy of the target's column types skips WAL writes while staging
+                connection.execute(text(f'CREATE UNLOGGED TABLE "{staging_table}" (LIKE "{table_name}" INCLUDING DEFAULTS)'))
+                source = f'SELECT {columns} FROM "{staging_table}"'
+            else:
+                connection.execute(text(f'CREATE TEMP TABLE "{staging_table}" AS SELECT * FROM "{table_name}" WHERE 0'))
+                # SQLite needs a WHERE clause to tell the upsert apart from a join constraint
+                source = f'SELECT {columns} FROM "{staging_table}" WHERE true'
+
+            df.to_sql(staging_table, con=connection, if_exists='append', index=False, method=method, chunksize=chunksize)
+            connection.execute(text(f'INSERT INTO "{table_name}" ({columns}) {source} ON CONFLICT ("{key}") {on_conflict}'))
+            connection.execute(text(f'DROP TABLE "{staging_table}"'))
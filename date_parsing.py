@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+
+# Date layouts found in the source data, most common first. Each one is tried as a strict,
+# vectorized pass; only values none of them match fall through to the slow mixed-format parser.
+# They are all unambiguous, so they give the same result as the mixed-format parser.
+KNOWN_DATE_FORMATS = [
+    '%Y-%m-%d',
+    '%Y-%m-%d %H:%M:%S',
+    '%Y %B %d',
+    '%B %Y %d',
+    '%Y/%m/%d',
+    '%d %B %Y',
+]
+
+
+def parse_dates(series, formats=KNOWN_DATE_FORMATS):
+    """
+    Parses a column of dates in mixed formats, equivalent to
+    `pd.to_datetime(series, errors='coerce', format='mixed')` but much faster on large columns.
+
+    Each distinct value is parsed once. Values are tried against `formats` with vectorized strict
+    passes, and only the remaining values are parsed element by element with the mixed-format parser.
+
+    Args:
+    series (pd.Series): The raw date values.
+    formats (list): strptime formats to try, in order (default KNOWN_DATE_FORMATS).
+
+    Returns:
+    pd.Series: The parsed dates, with NaT for values that could not be parsed.
+    """
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series
+
+    codes, uniques = pd.factorize(series)
+    uniques = pd.Series(uniques, dtype=object)
+    parsed = pd.Series(pd.NaT, index=uniques.index, dtype='datetime64[ns]')
+    remaining = uniques.map(type) == str
+
+    for fmt in formats:
+        if not remaining.any():
+            break
+        attempt = pd.to_datetime(uniques[remaining], format=fmt, errors='coerce')
+        matched = attempt.index[attempt.notna()]
+        parsed[matched] = attempt[matched]
+        remaining[matched] = False
+
+    # Non-string values and strings in unlisted formats take the slow path
+    remaining |= uniques.map(type) != str
+    if remaining.any():
+        residue = pd.to_datetime(uniques[remaining], errors='coerce', format='mixed')
+        if residue.dtype != parsed.dtype:
+            # e.g. timezone-aware values; keep the exact behaviour of the original parser
+            return pd.to_datetime(series, errors='coerce', format='mixed')
+        parsed[remaining] = residue
+
+    # Missing values are coded as -1, which picks the trailing NaT
+    values = np.append(parsed.to_numpy(), np.datetime64('NaT', 'ns'))[codes]
+    return pd.Series(values, index=series.index, name=series.name)
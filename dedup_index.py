@@ -0,0 +1,164 @@
+import os
+import sqlite3
+import logging
+import tempfile
+import threading
+import numpy as np
+import pandas as pd
+
+
+def key_hashes(df, subset):
+    """
+    Hashes the key columns of each row to a 64-bit integer.
+
+    Missing values hash alike, so they count as equal keys, as in `drop_duplicates`.
+
+    Args:
+    df (pd.DataFrame): The rows to hash.
+    subset (list): The key columns.
+
+    Returns:
+    np.ndarray: One uint64 hash per row.
+    """
+    return pd.util.hash_pandas_object(df[subset], index=False).to_numpy()
+
+
+class DedupIndex:
+    """
+    Set of row keys seen across a stream of chunks, for dropping duplicates with keep='first'
+    semantics without holding the whole table in memory.
+
+    Keys are stored as 64-bit hashes (8 bytes each) in a sorted array. Once more than
+    `max_memory_keys` are held, they are spilled to an indexed SQLite file and memory is freed.
+    With 64-bit hashes the chance of two different keys colliding is below 1e-9 for up to
+    100,000 keys and about 3e-4 for 100 million.
+    """
+
+    def __init__(self, max_memory_keys=5_000_000, spill_dir=None):
+        """
+        Args:
+        max_memory_keys (int): Maximum number of keys kept in memory before spilling to disk
+            (default 5,000,000, about 40 MB).
+        spill_dir (str): Directory for the spill file (default the system temporary directory).
+        """
+        self.max_memory_keys = max_memory_keys
+        self.spill_dir = spill_dir
+        self._memory = np.empty(0, dtype=np.uint64)
+        self._spill = None
+        self._spill_path = None
+        self._spilled_keys = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._memory) + self._spilled_keys
+
+    def _spill_to_disk(self):
+        """
+        Moves the in-memory keys to the SQLite spill file.
+        """
+        if self._spill is None:
+            handle, self._spill_path = tempfile.mkstemp(prefix='dedup_', suffix='.sqlite', dir=self.spill_dir)
+            os.close(handle)
+            self._spill = sqlite3.connect(self._spill_path, check_same_thread=False)
+            self._spill.execute('PRAGMA journal_mode = OFF')
+            self._spill.execute('PRAGMA synchronous = OFF')
+            self._spill.execute('CREATE TABLE seen (hash INTEGER PRIMARY KEY) WITHOUT ROWID')
+
+        # SQLite integers are signed, so the hashes are stored as their int64 bit pattern
+        self._spill.executemany('INSERT OR IGNORE INTO seen VALUES (?)',
+                                ((value,) for value in self._memory.view(np.int64).tolist()))
+        self._spill.commit()
+        self._spilled_keys += len(self._memory)
+        logging.info(f"Spilled {len(self._memory)} dedup keys to '{self._spill_path}'.")
+        self._memory = np.empty(0, dtype=np.uint64)
+
+    def _in_memory(self, hashes):
+        """
+        Looks hashes up in the sorted in-memory keys.
+        """
+        # Sorted probes walk the keys in order, which is much faster than random lookups
+        order = np.argsort(hashes)
+        probes = hashes[order]
+        positions = np.searchsorted(self._memory, probes)
+        hit = positions < len(self._memory)
+        hit[hit] = self._memory[positions[hit]] == probes[hit]
+        found = np.empty(len(hashes), dtype=bool)
+        found[order] = hit
+        return found
+
+    def contains(self, hashes):
+        """
+        Checks which hashes have been added before.
+
+        Args:
+        hashes (np.ndarray): uint64 key hashes.
+
+        Returns:
+        np.ndarray: Boolean mask, True where the hash is already in the index.
+        """
+        with self._lock:
+            found = self._in_memory(hashes)
+            if self._spill is not None and not found.all():
+                candidates = np.sort(hashes[~found])
+                self._spill.execute('CREATE TEMP TABLE IF NOT EXISTS probe (hash INTEGER)')
+                self._spill.execute('DELETE FROM probe')
+                self._spill.executemany('INSERT INTO probe VALUES (?)',
+                                        ((value,) for value in candidates.view(np.int64).tolist()))
+                rows = self._spill.execute('SELECT hash FROM probe JOIN seen USING (hash)').fetchall()
+                spilled = np.array([row[0] for row in rows], dtype=np.int64).view(np.uint64)
+                found |= np.isin(hashes, spilled)
+        return found
+
+    def add(self, hashes):
+        """
+        Adds hashes to the index, spilling to disk when the memory limit is exceeded.
+
+        Args:
+        hashes (np.ndarray): uint64 key hashes.
+        """
+        with self._lock:
+            new = np.sort(hashes)
+            new = new[np.diff(new, prepend=~new[:1]) != 0]
+            new = new[~self._in_memory(new)]
+            # Merging the sorted new keys in place is linear, unlike re-sorting all keys
+            self._memory = np.insert(self._memory, np.searchsorted(self._memory, new), new)
+            if len(self._memory) > self.max_memory_keys:
+                self._spill_to_disk()
+
+    def drop_duplicates(self, df, subset):
+        """
+        Drops rows whose key appeared earlier in this chunk or in any chunk passed before, and
+        records the remaining keys. Feeding the chunks of a table in order gives the same rows as
+        `drop_duplicates(subset=subset, keep='first')` on the whole table, as long as the key
+        columns have the same dtype in every chunk.
+
+        Args:
+        df (pd.DataFrame): The next chunk.
+        subset (list): The key columns.
+
+        Returns:
+        pd.DataFrame: The rows of the chunk with first-seen keys.
+        """
+        hashes = key_hashes(df, subset)
+        keep = ~pd.Series(hashes).duplicated(keep='first').to_numpy()
+        keep[keep] = ~self.contains(hashes[keep])
+        self.add(hashes[keep])
+        return df[keep]
+
+    def close(self):
+        """
+        Closes and deletes the spill file, if one was created.
+        """
+        with self._lock:
+            if self._spill is not None:
+                self._spill.close()
+                os.remove(self._spill_path)
+                self._spill = None
+            self._memory = np.empty(0, dtype=np.uint64)
+            self._spilled_keys = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
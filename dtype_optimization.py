@@ -0,0 +1,104 @@
+import numpy as np
+import pandas as pd
+from cleaning_kernels import STRING_DTYPE
+
+# Target storage for the columns of each cleaned table:
+# 'category' for low-cardinality labels, 'string' for identifiers and free text (Arrow-backed when
+# pyarrow is installed), 'int'/'float' for numbers that can be downcast to a narrower width.
+# 'float' columns are only narrowed when every value survives the round trip through float32, so
+# e.g. a weight of 1.6 keeps its float64 value. Prices and coordinates are left at 64-bit.
+TABLE_SCHEMAS = {
+    'dim_users': {
+        'country': 'category',
+        'country_code': 'category',
+        'company': 'string',
+        'email_address': 'string',
+        'address': 'string',
+        'phone_number': 'string',
+        'user_uuid': 'string',
+        'index': 'int',
+    },
+    'dim_card_details': {
+        'card_number': 'string',
+        'card_provider': 'category',
+    },
+    'dim_store_details': {
+        'store_code': 'string',
+        'address': 'string',
+        'locality': 'category',
+        'store_type': 'category',
+        'country_code': 'category',
+        'continent': 'category',
+        'staff_numbers': 'int',
+    },
+    'dim_products': {
+        'product_name': 'string',
+        'product_code': 'string',
+        'uuid': 'string',
+        'EAN': 'string',
+        'category': 'category',
+        'removed': 'category',
+        'weight': 'float',
+    },
+    'orders_table': {
+        'date_uuid': 'string',
+        'user_uuid': 'string',
+        'card_number': 'string',
+        'store_code': 'string',
+        'product_code': 'string',
+        'product_quantity': 'int',
+    },
+    'dim_date_times': {
+        'time_period': 'category',
+        'date_uuid': 'string',
+        'month': 'int',
+        'year': 'int',
+        'day': 'int',
+    },
+}
+
+
+def memory_usage_mb(df):
+    """
+    Measures the memory used by a DataFrame, including the contents of object columns.
+
+    Args:
+    df (pd.DataFrame): The DataFrame to measure.
+
+    Returns:
+    float: Memory usage in megabytes.
+    """
+    return df.memory_usage(deep=True).sum() / 1024 ** 2
+
+
+def _downcast_float(column):
+    values = pd.to_numeric(column)
+    narrow = values.astype('float32')
+    if np.array_equal(values.to_numpy(dtype='float64'), narrow.to_numpy(dtype='float64'), equal_nan=True):
+        return narrow
+    return values
+
+
+def optimize_dtypes(df, schema):
+    """
+    Converts columns to compact dtypes according to a table schema.
+
+    Integer columns are downcast to the narrowest width that holds their values, and float columns
+    to float32 only if that loses no precision; integer columns with missing values stay floating point.
+
+    Args:
+    df (pd.DataFrame): The cleaned DataFrame.
+    schema (dict): Column name to 'category', 'string', 'int' or 'float'. Columns missing from
+        the DataFrame are ignored.
+
+    Returns:
+    pd.DataFrame: A new DataFrame with the converted columns.
+    """
+    converters = {
+        'category': lambda column: column.astype('category'),
+        'string': lambda column: column.astype(STRING_DTYPE),
+        'int': lambda column: pd.to_numeric(column, downcast='integer'),
+        'float': _downcast_float,
+    }
+    converted = {name: converters[kind](df[name]) for name, kind in schema.items() if name in df.columns}
+    return df.assign(**converted)
@@ -0,0 +1,243 @@
+import os
+import json
+import time
+import uuid
+import cProfile
+import logging
+import threading
+import tracemalloc
+from contextlib import contextmanager
+import pandas as pd
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+
+def _max_rss_mb():
+    """
+    Returns the peak resident set size of the process in megabytes, or None where it is unavailable.
+    """
+    if resource is None:
+        return None
+    # ru_maxrss is reported in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class StageRecord:
+    """
+    Handle yielded by `PipelineMetrics.stage` for reporting the rows a stage consumed and produced.
+    """
+
+    def __init__(self):
+        self.rows_in = None
+        self.rows_out = None
+
+    def set_rows(self, rows_in=None, rows_out=None):
+        """
+        Args:
+        rows_in (int): Number of rows the stage received.
+        rows_out (int): Number of rows the stage produced.
+        """
+        if rows_in is not None:
+            self.rows_in = rows_in
+        if rows_out is not None:
+            self.rows_out = rows_out
+
+
+class PipelineMetrics:
+    """
+    Collects per-stage metrics for one pipeline run: wall time, CPU time, peak memory, rows in/out and
+    the rows rejected by each cleaning filter, and exports them as JSON or Prometheus text files.
+
+    A stage entered several times (e.g. once per streamed chunk) is aggregated under its name.
+    """
+
+    def __init__(self, output_dir='.etl_metrics', trace_memory=False, profile_stage=None):
+        """
+        Args:
+        output_dir (str): Directory for the exported metrics and profiles (default '.etl_metrics').
+        trace_memory (bool): Measure each stage's peak Python heap with tracemalloc. This slows the
+            run down considerably, and overlapping stages share one peak (default False).
+        profile_stage (str): Name of a single stage to run under cProfile; its stats are written
+            to '<output_dir>/<run_id>-<stage>.prof' (default None).
+        """
+        self.run_id = time.strftime('%Y%m%dT%H%M%S') + '-' + uuid.uuid4().hex[:8]
+        self.output_dir = output_dir
+        self.trace_memory = trace_memory
+        self.profile_stage = profile_stage
+        self.stages = {}
+        self.filters = {}
+        self._profiler = cProfile.Profile() if profile_stage else None
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, name):
+        """
+        Measures a block of code as a named stage.
+
+        CPU time is counted for the calling thread only, so work the stage hands off to its own
+        thread pools is not included.
+
+        Args:
+        name (str): The stage name, e.g. 'order_data.clean'.
+
+        Yields:
+        StageRecord: Handle for reporting the stage's rows in and out.
+        """
+        record = StageRecord()
+        profile = self._profiler is not None and name == self.profile_stage
+        if self.trace_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+        if profile:
+            self._profiler.enable()
+
+        error = None
+        wall_start, cpu_start = time.perf_counter(), time.thread_time()
+        try:
+            yield record
+        except Exception as e:
+            error = str(e)
+            raise
+        finally:
+            wall, cpu = time.perf_counter() - wall_start, time.thread_time() - cpu_start
+            if profile:
+                self._profiler.disable()
+                self._dump_profile(name)
+            peak = tracemalloc.get_traced_memory()[1] / 1024 ** 2 if self.trace_memory else None
+            self._record(name, wall, cpu, peak, record, error)
+
+    def call(self, name, func, *args, **kwargs):
+        """
+        Runs a function as a named stage. The length of the first DataFrame argument is recorded
+        as the rows in, and the length of a DataFrame result as the rows out.
+
+        Args:
+        name (str): The stage name.
+        func (callable): The extractor, cleaner or connector method to run.
+        *args, **kwargs: Arguments passed to `func`.
+
+        Returns:
+        The return value of `func`.
+        """
+        with self.stage(name) as record:
+            frames = [arg for arg in args if isinstance(arg, pd.DataFrame)]
+            if frames:
+                record.set_rows(rows_in=len(frames[0]))
+            result = func(*args, **kwargs)
+            if isinstance(result, pd.DataFrame):
+                record.set_rows(rows_out=len(result))
+            elif isinstance(result, tuple) and result and isinstance(result[0], pd.DataFrame):
+                record.set_rows(rows_out=len(result[0]))
+            return result
+
+    def _record(self, name, wall, cpu, peak, record, error):
+        with self._lock:
+            stats = self.stages.setdefault(name, {
+                'calls': 0, 'wall_seconds': 0.0, 'cpu_seconds': 0.0, 'peak_memory_mb': None,
+                'max_rss_mb': None, 'rows_in': None, 'rows_out': None, 'errors': 0,
+            })
+            stats['calls'] += 1
+            stats['wall_seconds'] += wall
+            stats['cpu_seconds'] += cpu
+            if peak is not None:
+                stats['peak_memory_mb'] = max(stats['peak_memory_mb'] or 0.0, peak)
+            stats['max_rss_mb'] = _max_rss_mb()
+            if record.rows_in is not None:
+                stats['rows_in'] = (stats['rows_in'] or 0) + record.rows_in
+            if record.rows_out is not None:
+                stats['rows_out'] = (stats['rows_out'] or 0) + record.rows_out
+            if error is not None:
+                stats['errors'] += 1
+                stats['last_error'] = error
+
+    def record_rejected(self, step, rows):
+        """
+        Adds to the number of rows rejected by a filter step.
+
+        Args:
+        step (str): The filter step, e.g. 'clean_orders_data.invalid_quantity'.
+        rows (int): Number of rows the step removed.
+        """
+        with self._lock:
+            self.filters[step] = self.filters.get(step, 0) + int(rows)
+
+    def _dump_profile(self, name):
+        os.makedirs(self.output_dir, exist_ok=True)
+        path = os.path.join(self.output_dir, f"{self.run_id}-{name}.prof")
+        self._profiler.dump_stats(path)
+        logging.info(f"Profile of stage '{name}' written to '{path}'.")
+
+    def to_dict(self):
+        """
+        Returns:
+        dict: The run id, the per-stage metrics and the rejected rows per filter step.
+        """
+        with self._lock:
+            return {
+                'run_id': self.run_id,
+                'stages': {name: dict(stats) for name, stats in self.stages.items()},
+                'filters': dict(self.filters),
+            }
+
+    def to_prometheus(self):
+        """
+        Renders the metrics in the Prometheus text exposition format.
+
+        Returns:
+        str: The metrics, one sample per line.
+        """
+        metrics = self.to_dict()
+        run_id = metrics['run_id']
+        gauges = [
+            ('etl_stage_calls', 'calls', 'Number of times the stage ran.'),
+            ('etl_stage_wall_seconds', 'wall_seconds', 'Wall time spent in the stage.'),
+            ('etl_stage_cpu_seconds', 'cpu_seconds', 'CPU time of the thread running the stage.'),
+            ('etl_stage_peak_memory_megabytes', 'peak_memory_mb', 'Peak traced Python heap during the stage.'),
+            ('etl_stage_max_rss_megabytes', 'max_rss_mb', 'Peak resident set size of the process after the stage.'),
+            ('etl_stage_rows_in', 'rows_in', 'Rows received by the stage.'),
+            ('etl_stage_rows_out', 'rows_out', 'Rows produced by the stage.'),
+            ('etl_stage_errors', 'errors', 'Number of times the stage raised an error.'),
+        ]
+
+        lines = []
+        for metric, field, description in gauges:
+            lines += [f"# HELP {metric} {description}", f"# TYPE {metric} gauge"]
+            for name, stats in metrics['stages'].items():
+                if stats[field] is not None:
+                    lines.append(f'{metric}{{run_id="{run_id}",stage="{name}"}} {stats[field]}')
+
+        lines += ["# HELP etl_filter_rejected_rows Rows removed by a cleaning filter step.",
+                  "# TYPE etl_filter_rejected_rows gauge"]
+        for step, rows in metrics['filters'].items():
+            lines.append(f'etl_filter_rejected_rows{{run_id="{run_id}",step="{step}"}} {rows}')
+        return '\n'.join(lines) + '\n'
+
+    def export(self, formats=('json', 'prometheus')):
+        """
+        Writes the metrics of this run to the output directory.
+
+        Args:
+        formats (iterable): 'json' and/or 'prometheus' (default both).
+
+        Returns:
+        list: Paths of the written files.
+        """
+        writers = {
+            'json': ('json', lambda: json.dumps(self.to_dict(), indent=2)),
+            'prometheus': ('prom', self.to_prometheus),
+        }
+        os.makedirs(self.output_dir, exist_ok=True)
+        paths = []
+        for fmt in formats:
+            if fmt not in writers:
+                raise ValueError(f"Unknown metrics format '{fmt}'. Expected 'json' or 'prometheus'.")
+            extension, render = writers[fmt]
+            path = os.path.join(self.output_dir, f"{self.run_id}.{extension}")
+            with open(path, 'w') as f:
+                f.write(render())
+            paths.append(path)
+        return paths
@@ -0,0 +1,128 @@
+import logging
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from schema import FOREIGN_KEYS, NATURAL_KEYS
+
+
+class ReferentialIntegrity:
+    """
+    Checks the foreign keys of fact rows against the keys of their dimension tables before the rows
+    are loaded, so orphans can be set aside instead of breaking the foreign key constraints later.
+
+    The dimension keys are held in hashed pandas Indexes built once, and each batch is checked with
+    a vectorized anti-join over its distinct key values.
+    """
+
+    def __init__(self, table_name='orders_table', metrics=None):
+        """
+        Args:
+        table_name (str): The fact table whose FOREIGN_KEYS are checked (default 'orders_table').
+        metrics (PipelineMetrics): If given, the orphans found per foreign key are recorded on it.
+        """
+        self.table_name = table_name
+        self.foreign_keys = FOREIGN_KEYS[table_name]
+        self.metrics = metrics
+        self.keys = {}
+        self.missing = {}
+
+    def set_keys(self, column, values):
+        """
+        Sets the valid keys for a foreign key column.
+
+        Args:
+        column (str): The foreign key column, e.g. 'store_code'.
+        values (iterable): The natural keys of the referenced dimension.
+        """
+        # Keys are compared as text, since UUID columns may be read back as uuid.UUID objects
+        self.keys[column] = pd.Index(pd.Series(values).dropna().astype(str).unique())
+
+    def load_keys(self, engine):
+        """
+        Reads the natural keys of every referenced dimension table from the database.
+
+        Args:
+        engine (Engine): SQLAlchemy engine of the sales database.
+
+        Returns:
+        bool: True if the keys of every dimension were read, False otherwise.
+        """
+        try:
+            for column, dimension in self.foreign_keys.items():
+                key = NATURAL_KEYS[dimension]
+                values = pd.read_sql(text(f'SELECT "{key}" FROM "{dimension}"'), engine)[key]
+                self.set_keys(column, values)
+                logging.info(f"Loaded {len(self.keys[column])} keys of '{dimension}' for '{self.table_name}.{column}'.")
+            return True
+
+        except SQLAlchemyError as e:
+            logging.error(f"Could not read the dimension keys of '{self.table_name}': {e}")
+        except Exception as e:
+            logging.error(f"An unexpected error occurred: {e}")
+        return False
+
+    def find_orphans(self, df):
+        """
+        Finds the rows whose foreign keys have no match in the referenced dimensions. Missing
+        (NULL) keys are not orphans, as they do not violate a foreign key.
+
+        Args:
+        df (pd.DataFrame): The fact rows.
+
+        Returns:
+        dict: Foreign key column to a boolean array, True for rows whose key is unknown.
+        """
+        orphans = {}
+        for column, keys in self.keys.items():
+            # Look each distinct value up once and broadcast the result back to the rows
+            codes, uniques = pd.factorize(df[column])
+            known = keys.get_indexer(pd.Index(uniques).astype(str)) >= 0
+            # Missing values are coded as -1, which picks the trailing True
+            orphans[column] = ~np.append(known, True)[codes]
+        return orphans
+
+    def check(self, df):
+        """
+        Splits a batch into the rows whose foreign keys all exist and the orphans, and adds the
+        orphans to the per-key report.
+
+        Args:
+        df (pd.DataFrame): The cleaned fact rows about to be loaded.
+
+        Returns:
+        tuple: The valid rows, and the orphan rows with a 'missing_keys' column naming the
+            foreign keys that have no match.
+        """
+        orphans = self.find_orphans(df)
+        is_orphan = np.zeros(len(df), dtype=bool)
+        for column, mask in orphans.items():
+            is_orphan |= mask
+            if self.metrics is not None:
+                self.metrics.record_rejected(f'{self.table_name}.orphan_{column}', int(mask.sum()))
+            if mask.any():
+                counts = df.loc[mask, column].astype(str).value_counts()
+                self.missing[column] = counts.add(self.missing.get(column, pd.Series(dtype='int64')), fill_value=0)
+
+        if not is_orphan.any():
+            return df, df.iloc[:0].assign(missing_keys=pd.Series(dtype=object))
+
+        missing_keys = pd.Series('', index=df.index[is_orphan], dtype=object)
+        for column, mask in orphans.items():
+            missing_keys += np.where(mask[is_orphan], f'{column},', '')
+        orphan_df = df[is_orphan].assign(missing_keys=missing_keys.str.rstrip(','))
+        logging.warning(f"Found {len(orphan_df)} of {len(df)} rows of '{self.table_name}' with unknown keys.")
+        return df[~is_orphan], orphan_df
+
+    def report(self):
+        """
+        Summarizes the orphans found so far by foreign key and missing key value.
+
+        Returns:
+        pd.DataFrame: 'column', 'key' and 'rows', the most frequent missing keys first.
+        """
+        frames = [pd.DataFrame({'column': column, 'key': counts.index, 'rows': counts.to_numpy(dtype='int64')})
+                  for column, counts in self.missing.items()]
+        if not frames:
+            return pd.DataFrame(columns=['column', 'key', 'rows'])
+        return pd.concat(frames, ignore_index=True).sort_values('rows', ascending=False, kind='stable').reset_index(drop=True)
@@ -0,0 +1,257 @@
+import os
+import glob
+import time
+import hashlib
+import logging
+import argparse
+import threading
+import pandas as pd
+from sales_rollup import (aggregate_sales, best_month_per_year, sales_by_channel, sales_by_month, sales_by_store_type,
+                          store_type_sales)
+
+# Snapshot tables the sales rollup is computed from
+SALES_TABLES = ('orders_table', 'dim_products', 'dim_store_details', 'dim_date_times')
+
+
+class SnapshotStore:
+    """
+    Stores cleaned tables as Parquet snapshots, one directory of part files per table, so they can be
+    queried without loading them into a database.
+    """
+
+    def __init__(self, snapshot_dir='.etl_snapshots'):
+        """
+        Args:
+        snapshot_dir (str): Directory holding the snapshots (default '.etl_snapshots').
+        """
+        self.snapshot_dir = snapshot_dir
+        self._lock = threading.Lock()
+
+    def _parts(self, table_name):
+        return sorted(glob.glob(os.path.join(self.snapshot_dir, table_name, '*.parquet')))
+
+    def save(self, table_name, df, append=False, part=None):
+        """
+        Writes a cleaned DataFrame to a table's snapshot.
+
+        Args:
+        table_name (str): The table name, e.g. 'dim_products'.
+        df (pd.DataFrame): The cleaned data.
+        append (bool): Add the data as a new part, e.g. for streamed chunks or incremental loads,
+            instead of replacing the snapshot (default False).
+        part (str): Name of the part. Saving a part of the same name again replaces it instead of
+            adding a copy, e.g. when a failed chunk is retried (default None, a new part).
+
+        Returns:
+        bool: True if the snapshot was written, False otherwise.
+        """
+        table_dir = os.path.join(self.snapshot_dir, table_name)
+        part_name = f"part-{part if part is not None else time.time_ns()}.parquet"
+        try:
+            with self._lock:
+                os.makedirs(table_dir, exist_ok=True)
+                old_parts = [] if append else [path for path in self._parts(table_name)
+                                               if os.path.basename(path) != part_name]
+
+                # Write under a temporary name so readers never see a half-written part
+                tmp_path = os.path.join(table_dir, f".{part_name}.tmp")
+                df.to_parquet(tmp_path, index=False)
+                os.replace(tmp_path, os.path.join(table_dir, part_name))
+
+                for path in old_parts:
+                    os.remove(path)
+            return True
+
+        except Exception as e:
+            logging.error(f"Could not write the snapshot of '{table_name}': {e}")
+            return False
+
+    def version(self, table_name):
+        """
+        Fingerprints a table's snapshot from its part files' names, sizes and modification times.
+
+        Args:
+        table_name (str): The table name.
+
+        Returns:
+        str: A string that changes whenever the snapshot changes, or None if there is no snapshot.
+        """
+        parts = self._parts(table_name)
+        if not parts:
+            return None
+        stats = [(os.path.basename(path), os.stat(path).st_size, os.stat(path).st_mtime_ns) for path in parts]
+        return hashlib.sha256(repr(stats).encode()).hexdigest()[:16]
+
+    def load(self, table_name, columns=None):
+        """
+        Reads a table's snapshot.
+
+        Args:
+        table_name (str): The table name.
+        columns (list): Columns to read; only these are decoded from the columnar files (default all).
+
+        Returns:
+        pd.DataFrame: The table's data.
+        """
+        parts = self._parts(table_name)
+        if not parts:
+            raise FileNotFoundError(f"No snapshot of '{table_name}' in '{self.snapshot_dir}'.")
+        return pd.concat([pd.read_parquet(path, columns=columns) for path in parts], ignore_index=True)
+
+
+class LocalAnalytics:
+    """
+    Runs the business queries of database_query.session.sql in-process over Parquet snapshots,
+    with vectorized pandas joins and aggregations.
+
+    Results are cached in memory and recomputed when a snapshot they read from changes.
+    """
+
+    def __init__(self, store=None):
+        """
+        Args:
+        store (SnapshotStore): The snapshots to query (default a SnapshotStore in '.etl_snapshots').
+        """
+        self.store = store or SnapshotStore()
+        self._cache = {}
+        self._lock = threading.Lock()
+
+    def _cached(self, key, tables, compute):
+        """
+        Returns a cached result while the snapshots of `tables` are unchanged, otherwise recomputes it.
+
+        Args:
+        key (tuple): The query name and arguments.
+        tables (iterable): Snapshot tables the query reads.
+        compute (callable): Computes the result.
+        """
+        versions = tuple(self.store.version(table) for table in tables)
+        with self._lock:
+            entry = self._cache.get(key)
+        if entry is not None and entry[0] == versions:
+            return entry[1].copy()
+
+        result = compute()
+        with self._lock:
+            self._cache[key] = (versions, result)
+        return result.copy()
+
+    def sales_facts(self):
+        """
+        Sales facts at (year, month, store_type, country_code) grain, shared by the sales queries.
+
+        Returns:
+        pd.DataFrame: The output of `sales_rollup.aggregate_sales` over the snapshots.
+        """
+        def compute():
+            return aggregate_sales(
+                self.store.load('orders_table', ['date_uuid', 'store_code', 'product_code', 'product_quantity']),
+                self.store.load('dim_products', ['product_code', 'product_price']),
+                self.store.load('dim_store_details', ['store_code', 'store_type', 'country_code']),
+                self.store.load('dim_date_times', ['date_uuid', 'year', 'month']),
+            )
+        return self._cached(('sales_facts',), SALES_TABLES, compute)
+
+    def stores_by_country(self):
+        """
+        Number of stores per country.
+
+        Returns:
+        pd.DataFrame: 'country_code' and 'total_no_stores', most stores first.
+        """
+        def compute():
+            stores = self.store.load('dim_store_details', ['store_code', 'country_code'])
+            result = stores.groupby('country_code')['store_code'].nunique().rename('total_no_stores').reset_index()
+            return result.sort_values('total_no_stores', ascending=False).reset_index(drop=True)
+        return self._cached(('stores_by_country',), ['dim_store_details'], compute)
+
+    def stores_by_locality(self, limit=7):
+        """
+        Localities with the most stores.
+
+        Args:
+        limit (int): Number of localities to return (default 7).
+
+        Returns:
+        pd.DataFrame: 'locality' and 'total_no_stores', most stores first.
+        """
+        def compute():
+            stores = self.store.load('dim_store_details', ['store_code', 'locality'])
+            result = stores.groupby('locality')['store_code'].count().rename('total_no_stores').reset_index()
+            return result.nlargest(limit, 'total_no_stores').reset_index(drop=True)
+        return self._cached(('stores_by_locality', limit), ['dim_store_details'], compute)
+
+    def staff_by_country(self):
+        """
+        Staff headcount per country.
+
+        Returns:
+        pd.DataFrame: 'total_staff_numbers' and 'country_code', largest headcount first.
+        """
+        def compute():
+            stores = self.store.load('dim_store_details', ['staff_numbers', 'country_code'])
+            result = stores.groupby('country_code')['staff_numbers'].sum().rename('total_staff_numbers').reset_index()
+            result = result.sort_values('total_staff_numbers', ascending=False).reset_index(drop=True)
+            return result[['total_staff_numbers', 'country_code']]
+        return self._cached(('staff_by_country',), ['dim_store_details'], compute)
+
+    def sales_by_month(self, limit=6):
+        """Months with the highest sales; see `sales_rollup.sales_by_month`."""
+        return self._cached(('sales_by_month', limit), SALES_TABLES, lambda: sales_by_month(self.sales_facts(), limit))
+
+    def sales_by_channel(self):
+        """Online vs offline sales; see `sales_rollup.sales_by_channel`."""
+        return self._cached(('sales_by_channel',), SALES_TABLES, lambda: sales_by_channel(self.sales_facts()))
+
+    def sales_by_store_type(self):
+        """Sales share per store type; see `sales_rollup.sales_by_store_type`."""
+        return self._cached(('sales_by_store_type',), SALES_TABLES, lambda: sales_by_store_type(self.sales_facts()))
+
+    def best_month_per_year(self, limit=10):
+        """Best month of each year; see `sales_rollup.best_month_per_year`."""
+        return self._cached(('best_month_per_year', limit), SALES_TABLES,
+                            lambda: best_month_per_year(self.sales_facts(), limit))
+
+    def store_type_sales(self, country_code='DE'):
+        """Sales per store type in one country; see `sales_rollup.store_type_sales`."""
+        return self._cached(('store_type_sales', country_code), SALES_TABLES,
+                            lambda: store_type_sales(self.sales_facts(), country_code))
+
+    def sales_speed(self):
+        """
+        Average time between consecutive sales in each year.
+
+        Returns:
+        pd.DataFrame: 'year' and the average gap as 'hours', 'minutes', 'seconds' and 'milliseconds',
+            slowest year first.
+        """
+        def compute():
+            orders = self.store.load('orders_table', ['date_uuid'])
+            dates = self.store.load('dim_date_times', ['date_uuid', 'year', 'timestamp'])
+            sales = orders.merge(dates, on='date_uuid').sort_values(['year', 'timestamp'])
+            gaps = sales.groupby('year')['timestamp'].diff().dropna()
+            average = gaps.groupby(sales.loc[gaps.index, 'year']).mean().sort_values(ascending=False)
+
+            components = average.dt.components
+            return pd.DataFrame({
+                'year': average.index.astype('int64'),
+                'hours': (components['days'] * 24 + components['hours']).to_numpy(),
+                'minutes': components['minutes'].to_numpy(),
+                'seconds': components['seconds'].to_numpy(),
+                'milliseconds': components['milliseconds'].to_numpy(),
+            })
+        return self._cached(('sales_speed',), ['orders_table', 'dim_date_times'], compute)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Run the business queries over local Parquet snapshots.')
+    parser.add_argument('--snapshot-dir', default='.etl_snapshots', help='Directory holding the snapshots.')
+    args = parser.parse_args()
+
+    analytics = LocalAnalytics(SnapshotStore(args.snapshot_dir))
+    for query in ['stores_by_country', 'stores_by_locality', 'sales_by_month', 'sales_by_channel', 'sales_by_store_type',
+                  'best_month_per_year', 'staff_by_country', 'store_type_sales', 'sales_speed']:
+        start = time.perf_counter()
+        result = getattr(analytics, query)()
+        print(f"\n{query} ({(time.perf_counter() - start) * 1000:.0f} ms)")
+        print(result.to_string(index=False))
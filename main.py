@@ -1,7 +1,57 @@
 # Import necessary modules and classes
-from data_utils import DatabaseConnector
+import time
+import argparse
+import functools
+import pandas as pd
+from checkpoints import CheckpointStore, frame_fingerprint
+from data_utils import DatabaseConnector, engine_registry
 from data_extraction import DataExtractor
-from data_cleaning import DataCleaning
+from data_cleaning import ORDERS_MIN_PARTITION_ROWS, DataCleaning, orders_cleaning_executor
+from instrumentation import PipelineMetrics
+from integrity import ReferentialIntegrity
+from local_analytics import SnapshotStore
+from pipeline import PipelineRunner
+from sales_rollup import SalesRollup
+from schema import add_constraints
+from source_cache import SourceCache
+from state_store import WatermarkStore
+
+# Per-table high-water marks for incremental extraction from the RDS tables
+watermark_store = WatermarkStore()
+
+# Parsed copies of the S3 CSV, PDF and JSON sources, revalidated on every run
+source_cache = SourceCache()
+
+# Per-stage timings, row counts and filter rejections for this run, exported when the pipeline ends
+pipeline_metrics = PipelineMetrics()
+
+# Parquet snapshots of the cleaned tables for local analytics; enabled with --snapshot-dir
+snapshot_store = None
+
+# Orders whose keys are missing from the loaded dimensions are set aside here instead of being loaded;
+# with --load-orphans they are only reported
+quarantine_store = SnapshotStore('.etl_quarantine')
+
+# Raw and cleaned outputs of each stage, kept until the stage is loaded so a rerun resumes from them
+checkpoint_store = CheckpointStore()
+
+# Function to write a cleaned table to its local snapshot, called after a successful upload so
+# the snapshot holds the same rows as the database
+def save_snapshot(table_name, df, append=False):
+    if snapshot_store is not None:
+        pipeline_metrics.call(f'{table_name}.snapshot', snapshot_store.save, table_name, df, append=append)
+
+# Function to run a stage's extract step, or reuse its output from an interrupted run
+def extract_step(stage, key, func, *args, **kwargs):
+    return checkpoint_store.cached(stage, 'extract', key, pipeline_metrics.call, f'{stage}.extract', func, *args, **kwargs)
+
+# Function to run a stage's clean step, or reuse its output if the same raw data was already cleaned
+# by the current cleaning code
+def clean_step(stage, func, df, *args, **kwargs):
+    if df is None:
+        return pipeline_metrics.call(f'{stage}.clean', func, df, *args, **kwargs)
+    return checkpoint_store.cached(stage, 'clean', {'input': frame_fingerprint(df)}, pipeline_metrics.call,
+                                   f'{stage}.clean', func, df, *args, **kwargs)
 
 # Step 1: Initialize connectors and engines
 def initialize_connectors_and_extract_data():
@@ -15,44 +65,70 @@ def initialize_connectors_and_extract_data():
     return db_connector, sd_connector, engine, sd_engine
 
 # Function to extract, clean and upload user data
-def process_user_data():
+def process_user_data(incremental=True):
     db_connector, sd_connector, engine, sd_engine = initialize_connectors_and_extract_data()
-    extractor = DataExtractor(engine)
+    extractor = DataExtractor(engine, watermark_store)
 
     # List tables and extract data from 'legacy_users'
     tables = db_connector.list_db_tables(engine)
     if 'legacy_users' in tables:
-        legacy_users_df = extractor.read_table_data('legacy_users')
-        data_cleaner = DataCleaning()
-        cleaned_users_df = data_cleaner.clean_user_data(legacy_users_df)
+        if incremental:
+            # An interrupted run leaves the rows past the same watermark in a checkpoint
+            key = {'table': 'legacy_users', 'after': watermark_store.get('legacy_users')}
+            legacy_users_df = checkpoint_store.load('user_data', 'extract', key)
+            if legacy_users_df is not None:
+                new_watermark = legacy_users_df['index'].max()
+            else:
+                legacy_users_df, new_watermark = pipeline_metrics.call('user_data.extract', extractor.read_incremental_table_data,
+                                                                       'legacy_users', 'index')
+                if legacy_users_df is not None and not legacy_users_df.empty:
+                    checkpoint_store.save('user_data', 'extract', key, legacy_users_df)
+            if legacy_users_df is not None and legacy_users_df.empty:
+                print("No new rows in 'legacy_users'.")
+                return True
+        else:
+            legacy_users_df = extract_step('user_data', {'table': 'legacy_users'}, extractor.read_table_data, 'legacy_users')
+        data_cleaner = DataCleaning(metrics=pipeline_metrics)
+        cleaned_users_df = clean_step('user_data', data_cleaner.clean_user_data, legacy_users_df)
 
         # Upload cleaned data to 'dim_users'
-        upload_status = sd_connector.upload_to_db(cleaned_users_df, 'dim_users', sd_engine)
+        upload_status = pipeline_metrics.call('user_data.upload', sd_connector.upload_to_db,
+                                              cleaned_users_df, 'dim_users', sd_engine, mode='merge')
         if upload_status:
             print("Data successfully uploaded to 'dim_users'.")
+            save_snapshot('dim_users', cleaned_users_df, append=incremental)
+            if incremental:
+                watermark_store.advance('legacy_users', new_watermark)
+            checkpoint_store.clear('user_data')
         else:
             print("Data upload to 'dim_users' failed.")
+        return upload_status
     else:
         print("Table 'legacy_users' not found.")
+        return False
 
 # Function to extract, clean and upload card details
 def process_card_data():
     sd_connector = DatabaseConnector()
     engine = sd_connector.init_db_engine('db_cred2.yaml')
-    extractor = DataExtractor(engine)
+    extractor = DataExtractor(engine, cache=source_cache)
 
     pdf_link = 'https://data-handling-public.s3.eu-west-1.amazonaws.com/card_details.pdf'
-    df = extractor.read_pdf_data(pdf_link)
+    df = extract_step('card_data', {'link': pdf_link}, extractor.read_pdf_data_parallel, pdf_link)
     
-    data_cleaner = DataCleaning()
-    cleaned_pdf_df = data_cleaner.clean_card_data(df)
+    data_cleaner = DataCleaning(metrics=pipeline_metrics)
+    cleaned_pdf_df = clean_step('card_data', data_cleaner.clean_card_data, df)
 
     # Upload cleaned data to 'dim_card_details'
-    upload_status = sd_connector.upload_to_db(cleaned_pdf_df, 'dim_card_details', engine)
+    upload_status = pipeline_metrics.call('card_data.upload', sd_connector.upload_to_db,
+                                          cleaned_pdf_df, 'dim_card_details', engine, mode='merge')
     if upload_status:
         print("Data successfully uploaded to 'dim_card_details'.")
+        save_snapshot('dim_card_details', cleaned_pdf_df)
+        checkpoint_store.clear('card_data')
     else:
         print("Data upload to 'dim_card_details' failed.")
+    return upload_status
 
 # Function to extract, clean and upload store details
 def process_store_data():
@@ -62,91 +138,286 @@ def process_store_data():
 
     extractor = DataExtractor()
     num_stores = extractor.list_number_of_stores(num_stores_api, dict)
-    store_df = extractor.retrieve_stores_data(retrieve_store_api, num_stores, dict)
 
-    data_cleaner = DataCleaning()
-    cleaned_store_df = data_cleaner.clean_store_data(store_df)
+    # An interrupted run leaves the stores it fetched in a checkpoint; only the stores that failed
+    # then are fetched again
+    key = {'endpoint': retrieve_store_api, 'number_of_stores': num_stores}
+    store_df = checkpoint_store.load('store_data', 'extract', key)
+    failed_stores = checkpoint_store.metadata('store_data', 'extract', key).get('failed_stores') if store_df is not None else None
+    if store_df is None or failed_stores:
+        fetched_df = pipeline_metrics.call('store_data.extract', extractor.retrieve_stores_data_concurrent,
+                                           retrieve_store_api, num_stores, dict, store_numbers=failed_stores)
+        if fetched_df is not None:
+            store_df = fetched_df if store_df is None else pd.concat([store_df, fetched_df], ignore_index=True)
+        if store_df is not None:
+            checkpoint_store.save('store_data', 'extract', key, store_df, metadata={'failed_stores': extractor.failed_stores})
+
+    data_cleaner = DataCleaning(metrics=pipeline_metrics)
+    cleaned_store_df = clean_step('store_data', data_cleaner.clean_store_data, store_df)
 
     # Upload cleaned data to 'dim_store_details'
     sd_connector = DatabaseConnector()
     engine = sd_connector.init_db_engine('db_cred2.yaml')
-    upload_status = sd_connector.upload_to_db(cleaned_store_df, 'dim_store_details', engine)
+    upload_status = pipeline_metrics.call('store_data.upload', sd_connector.upload_to_db,
+                                          cleaned_store_df, 'dim_store_details', engine, mode='merge')
 
     if upload_status:
         print("Data successfully uploaded to 'dim_store_details'.")
+        save_snapshot('dim_store_details', cleaned_store_df)
+        checkpoint_store.clear('store_data')
     else:
         print("Data upload to 'dim_store_details' failed.")
+    return upload_status
 
 # Function to extract, clean and upload product data
 def process_product_data():
     s3_address = 's3://data-handling-public/products.csv'
-    extractor = DataExtractor()
-    product_df = extractor.extract_from_s3(s3_address)
+    extractor = DataExtractor(cache=source_cache)
+    product_df = extract_step('product_data', {'source': s3_address}, extractor.extract_from_s3, s3_address)
+
+    data_cleaner = DataCleaning(metrics=pipeline_metrics)
 
-    data_cleaner = DataCleaning()
-    cleaned_product_df = data_cleaner.convert_product_weights(product_df)
-    cleaned_product_df = data_cleaner.clean_products_data(cleaned_product_df)
+    def clean_products(df):
+        return data_cleaner.clean_products_data(data_cleaner.convert_product_weights(df))
+    cleaned_product_df = clean_step('product_data', clean_products, product_df)
 
     # Upload cleaned data to 'dim_products'
     sd_connector = DatabaseConnector()
     engine = sd_connector.init_db_engine('db_cred2.yaml')
-    upload_status = sd_connector.upload_to_db(cleaned_product_df, 'dim_products', engine)
+    upload_status = pipeline_metrics.call('product_data.upload', sd_connector.upload_to_db,
+                                          cleaned_product_df, 'dim_products', engine, mode='merge')
 
     if upload_status:
         print("Data successfully uploaded to 'dim_products'.")
+        save_snapshot('dim_products', cleaned_product_df)
+        checkpoint_store.clear('product_data')
     else:
         print("Data upload to 'dim_products' failed.")
+    return upload_status
 
 # Function to extract, clean and upload order data
-def process_order_data():
+def process_order_data(chunksize=50000, incremental=True, clean_workers=None):
     db_connector = DatabaseConnector()
     engine = db_connector.init_db_engine('db_cred.yaml')
 
-    extractor = DataExtractor(engine)
-    orders_df = extractor.read_rds_table(db_connector, 'orders_table')
-
-    data_cleaner = DataCleaning()
-    cleaned_order_df = data_cleaner.clean_orders_data(orders_df)
+    tables = db_connector.list_db_tables(engine)
+    if 'orders_table' not in tables:
+        print("Table 'orders_table' not found.")
+        return False
 
-    # Upload cleaned data to 'orders_table'
     sd_connector = DatabaseConnector()
     sd_engine = sd_connector.init_db_engine('db_cred2.yaml')
-    upload_status = sd_connector.upload_to_db(cleaned_order_df, 'orders_table', sd_engine)
+
+    extractor = DataExtractor(engine)
+    data_cleaner = DataCleaning(metrics=pipeline_metrics)
+
+    # Parallel cleaning gives each worker a partition of at least ORDERS_MIN_PARTITION_ROWS rows, so
+    # the chunks are made large enough to be split across all of them. One pool serves every chunk,
+    # so the workers start only once per run
+    clean_executor = None
+    if clean_workers:
+        chunksize = max(chunksize, clean_workers * ORDERS_MIN_PARTITION_ROWS)
+        clean_executor = orders_cleaning_executor(clean_workers)
+
+    # Only fetch rows past the last loaded 'index' when running incrementally
+    watermark = watermark_store.get('orders_table') if incremental else None
+
+    # Each loaded chunk is added to the sales rollup; orders loaded before the rollup existed are
+    # covered by rebuilding it once after the load instead
+    rollup = SalesRollup(sd_engine)
+    rebuild_rollup = not rollup.exists()
+
+    # Orders referencing keys missing from the dimensions would break the foreign keys, so they are
+    # found with an anti-join against the loaded dimension keys before each chunk is uploaded
+    integrity = ReferentialIntegrity('orders_table', metrics=pipeline_metrics)
+    check_integrity = pipeline_metrics.call('order_data.integrity_keys', integrity.load_keys, sd_engine)
+    if not check_integrity:
+        print("Could not read the dimension keys; orders are loaded without an integrity check.")
+
+    # Stream the fact table chunk by chunk so it never sits in memory in full. Chunks extracted by an
+    # interrupted run are checkpointed under the 'index' they start after and are read back first;
+    # the server-side stream then starts behind the last of them
+    upload_status = True
+    quarantine_failed = False
+    loaded_chunks = 0
+    position = watermark
+    chunks = None
+    while True:
+        # Time each fetch separately, since the generator reads lazily from the server-side cursor
+        with pipeline_metrics.stage('order_data.extract') as record:
+            key = {'table': 'orders_table', 'after': position, 'chunksize': chunksize}
+            orders_chunk = checkpoint_store.load('order_data', 'extract', key) if chunks is None else None
+            if orders_chunk is None:
+                if chunks is None:
+                    chunks = extractor.stream_table_data('orders_table', chunksize=chunksize, watermark_column='index',
+                                                         watermark=position)
+                try:
+                    orders_chunk = next(chunks, None)
+                except Exception:
+                    # A stream that fails part-way must fail the stage, not look like the end of the table
+                    print("Streaming 'orders_table' failed; the chunks loaded so far are kept for the next run.")
+                    upload_status = False
+                    break
+                if orders_chunk is not None and not orders_chunk.empty:
+                    checkpoint_store.save('order_data', 'extract', key, orders_chunk)
+            record.set_rows(rows_out=len(orders_chunk) if orders_chunk is not None else 0)
+        # pandas yields a single empty frame when there are no rows past the watermark
+        if orders_chunk is None or orders_chunk.empty:
+            break
+        # A plain int, so the next chunk's checkpoint key matches a rerun's and the driver can bind it
+        position = orders_chunk['index'].max().item()
+
+        # With clean_workers, large chunks are cleaned in row partitions across a process pool
+        if clean_workers:
+            cleaned_order_df = clean_step('order_data', data_cleaner.clean_orders_data_parallel, orders_chunk,
+                                          max_workers=clean_workers, executor=clean_executor)
+        else:
+            cleaned_order_df = clean_step('order_data', data_cleaner.clean_orders_data, orders_chunk)
+
+        if check_integrity:
+            valid_order_df, orphan_df = pipeline_metrics.call('order_data.integrity', integrity.check, cleaned_order_df)
+            if quarantine_store is not None:
+                # Orphans are only left out of the load once they are safely in quarantine; otherwise the
+                # stage stops with the chunk unloaded, so a rerun checks it again instead of losing them.
+                # The part is named after the chunk's rows, so a retried chunk replaces its orphans
+                part = f"index-{orders_chunk['index'].min()}-{position}"
+                if not orphan_df.empty and not pipeline_metrics.call('order_data.quarantine', quarantine_store.save,
+                                                                     'orders_table', orphan_df, append=True, part=part):
+                    print(f"Could not quarantine {len(orphan_df)} orders with unknown keys; stopping the load.")
+                    quarantine_failed = True
+                    upload_status = False
+                    break
+                cleaned_order_df = valid_order_df
+
+        # Upload cleaned data to 'orders_table'
+        if not pipeline_metrics.call('order_data.upload', sd_connector.upload_to_db, cleaned_order_df, 'orders_table',
+                                     sd_engine, constraints=False):
+            upload_status = False
+            break
+
+        # A full reload replaces the snapshot with its first chunk; later chunks and incremental runs add to it
+        save_snapshot('orders_table', cleaned_order_df, append=incremental or loaded_chunks > 0)
+        loaded_chunks += 1
+
+        if not rebuild_rollup and not pipeline_metrics.call('order_data.rollup', rollup.merge_batch, cleaned_order_df):
+            rebuild_rollup = True
+
+        # Chunks arrive in 'index' order, so everything up to this chunk is now loaded
+        if incremental:
+            watermark_store.advance('orders_table', orders_chunk['index'].max())
+
+    if clean_executor is not None:
+        clean_executor.shutdown()
 
     if upload_status:
         print("Data successfully uploaded to 'orders_table'.")
+        checkpoint_store.clear('order_data')
+        # Keys and indexes are built once over the loaded table instead of being maintained per chunk
+        if 'orders_table' in (sd_connector.list_db_tables(sd_engine) or []) and \
+                not pipeline_metrics.call('order_data.constraints', add_constraints, 'orders_table', sd_engine):
+            print("Could not add all keys and indexes to 'orders_table'.")
     else:
         print("Data upload to 'orders_table' failed.")
 
+    # Rebuild even after a failed upload: chunks loaded before the failure are behind the watermark, so
+    # a chunk whose rollup merge failed would never be merged by a later run
+    if rebuild_rollup and 'orders_table' in (sd_connector.list_db_tables(sd_engine) or []) and \
+            not pipeline_metrics.call('order_data.rollup', rollup.rebuild):
+        print("Could not rebuild 'sales_rollup'; it may be out of date until it is rebuilt.")
+
+    orphan_report = integrity.report()
+    if not orphan_report.empty:
+        action = f"quarantined in '{quarantine_store.snapshot_dir}'" if quarantine_store is not None else 'loaded anyway'
+        if quarantine_failed:
+            action += ', except for the chunk that could not be saved'
+        print(f"Orders with keys missing from the dimensions ({action}):")
+        print(orphan_report.groupby('column')['rows'].sum().to_string())
+        print(f"Most frequent missing keys:\n{orphan_report.head(10).to_string(index=False)}")
+    return upload_status
+
 # Function to extract, clean and upload date data
 def process_date_data():
-    extractor = DataExtractor()
-    cleaner = DataCleaning()
+    extractor = DataExtractor(cache=source_cache)
+    cleaner = DataCleaning(metrics=pipeline_metrics)
     db_connector = DatabaseConnector()
 
     json_url = 'https://data-handling-public.s3.eu-west-1.amazonaws.com/date_details.json'
-    date_df = extractor.extract_json_from_s3(json_url)
+    date_df = extract_step('date_data', {'url': json_url}, extractor.extract_json_from_s3, json_url)
 
     if date_df is not None:
-        cleaned_date_df = cleaner.clean_date_data(date_df)
+        cleaned_date_df = clean_step('date_data', cleaner.clean_date_data, date_df)
 
         engine = db_connector.init_db_engine('db_cred2.yaml')
         if engine is not None:
-            upload_status = db_connector.upload_to_db(cleaned_date_df, 'dim_date_times', engine)
+            upload_status = pipeline_metrics.call('date_data.upload', db_connector.upload_to_db,
+                                                  cleaned_date_df, 'dim_date_times', engine, mode='merge')
             if upload_status:
                 print("Data successfully uploaded to 'dim_date_times'.")
+                save_snapshot('dim_date_times', cleaned_date_df)
+                checkpoint_store.clear('date_data')
             else:
                 print("Data upload to 'dim_date_times' failed.")
+            return upload_status
         else:
             print("Failed to initialize the database engine.")
     else:
         print("Failed to extract JSON data from S3.")
+    return False
+
+# Build the pipeline: the dimension loads are independent, but 'orders_table' references
+# every dimension through foreign keys, so it is loaded last
+def build_pipeline(max_workers=6, executor='thread', clean_workers=None):
+    runner = PipelineRunner(max_workers=max_workers, executor=executor)
+    runner.add_stage('user_data', process_user_data)
+    runner.add_stage('card_data', process_card_data)
+    runner.add_stage('store_data', process_store_data)
+    runner.add_stage('product_data', process_product_data)
+    runner.add_stage('date_data', process_date_data)
+    runner.add_stage('order_data', functools.partial(process_order_data, clean_workers=clean_workers),
+                     depends_on=['user_data', 'card_data', 'store_data', 'product_data', 'date_data'])
+    return runner
 
 # Main entry point for all processes
 if __name__ == '__main__':
-    process_user_data()
-    process_card_data()
-    process_store_data()
-    process_product_data()
-    process_order_data()
-    process_date_data()
+    parser = argparse.ArgumentParser(description='Run the retail data ETL pipeline.')
+    parser.add_argument('--metrics-dir', default='.etl_metrics', help='Directory for the exported run metrics.')
+    parser.add_argument('--metrics-format', choices=['json', 'prometheus'], nargs='+', default=['json', 'prometheus'],
+                        help='Formats of the exported run metrics.')
+    parser.add_argument('--trace-memory', action='store_true', help='Measure the peak heap of every stage (slower).')
+    parser.add_argument('--snapshot-dir', help='Also write Parquet snapshots of the cleaned tables here for local_analytics.py.')
+    parser.add_argument('--profile-stage', help="Run one stage, e.g. 'order_data.clean', under cProfile.")
+    parser.add_argument('--checkpoint-dir', default='.etl_checkpoints',
+                        help='Directory for the stage checkpoints a rerun resumes from.')
+    parser.add_argument('--force-stage', nargs='+', default=[],
+                        choices=['user_data', 'card_data', 'store_data', 'product_data', 'date_data', 'order_data'],
+                        help='Rerun these stages from scratch, ignoring their checkpoints.')
+    parser.add_argument('--quarantine-dir', default='.etl_quarantine',
+                        help='Directory for the orders whose keys are missing from the dimensions.')
+    parser.add_argument('--load-orphans', action='store_true',
+                        help='Load orders with keys missing from the dimensions instead of quarantining them.')
+    parser.add_argument('--clean-workers', type=int,
+                        help='Clean order chunks across this many processes; chunks grow to '
+                             f'{ORDERS_MIN_PARTITION_ROWS:,} rows per worker.')
+    args = parser.parse_args()
+
+    pipeline_metrics = PipelineMetrics(output_dir=args.metrics_dir, trace_memory=args.trace_memory,
+                                       profile_stage=args.profile_stage)
+    if args.snapshot_dir:
+        snapshot_store = SnapshotStore(args.snapshot_dir)
+    checkpoint_store = CheckpointStore(args.checkpoint_dir, force_stages=args.force_stage)
+    quarantine_store = None if args.load_orphans else SnapshotStore(args.quarantine_dir)
+
+    start = time.perf_counter()
+    summary = build_pipeline(clean_workers=args.clean_workers).run()
+
+    for stage, result in summary.items():
+        duration = f"{result['duration']:.2f}s" if result['duration'] is not None else '-'
+        print(f"{stage:<15} {result['status']:<10} {duration}")
+    print(f"Pipeline finished in {time.perf_counter() - start:.2f}s")
+
+    # Every stage shares the pooled engines from the registry; report how they were used
+    for cred_file, stats in engine_registry.pool_stats().items():
+        print(f"Connection pool for '{cred_file}': {stats}")
+
+    for path in pipeline_metrics.export(args.metrics_format):
+        print(f"Run metrics written to '{path}'.")
@@ -0,0 +1,122 @@
+import time
+import logging
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+
+
+def _timed_call(func):
+    """
+    Runs a stage function, measuring its wall time and capturing any error.
+
+    Defined at module level so it can be pickled for process pools.
+
+    Args:
+    func (callable): The stage function.
+
+    Returns:
+    tuple: The function's return value, its duration in seconds and the error message or None.
+    """
+    start = time.perf_counter()
+    try:
+        return func(), time.perf_counter() - start, None
+    except Exception as e:
+        return None, time.perf_counter() - start, str(e)
+
+
+class PipelineRunner:
+    """
+    Runs pipeline stages as a dependency graph (DAG), executing independent stages concurrently.
+    """
+
+    def __init__(self, max_workers=4, executor='thread'):
+        """
+        Args:
+        max_workers (int): Maximum number of stages running at the same time (default 4).
+        executor (str): 'thread' for a thread pool or 'process' for a process pool (default 'thread').
+        """
+        if executor not in ('thread', 'process'):
+            raise ValueError(f"Unknown executor '{executor}'. Expected 'thread' or 'process'.")
+        self.max_workers = max_workers
+        self.executor = executor
+        self.stages = {}
+
+    def add_stage(self, name, func, depends_on=()):
+        """
+        Registers a stage.
+
+        Args:
+        name (str): Unique stage name.
+        func (callable): Function run without arguments. Returning False or raising marks the stage as failed.
+        depends_on (iterable): Names of stages that must succeed before this one starts.
+        """
+        if name in self.stages:
+            raise ValueError(f"Stage '{name}' is already registered.")
+        self.stages[name] = (func, tuple(depends_on))
+
+    def _check_graph(self):
+        """
+        Ensures every dependency exists and the stages contain no cycles.
+        """
+        for name, (_, depends_on) in self.stages.items():
+            missing = [dep for dep in depends_on if dep not in self.stages]
+            if missing:
+                raise ValueError(f"Stage '{name}' depends on unknown stages: {missing}")
+
+        visiting, visited = set(), set()
+
+        def visit(name):
+            if name in visited:
+                return
+            if name in visiting:
+                raise ValueError(f"Dependency cycle detected at stage '{name}'.")
+            visiting.add(name)
+            for dep in self.stages[name][1]:
+                visit(dep)
+            visiting.remove(name)
+            visited.add(name)
+
+        for name in self.stages:
+            visit(name)
+
+    def run(self):
+        """
+        Runs all stages, starting each as soon as its dependencies have succeeded.
+        Stages whose dependencies failed or were skipped are skipped.
+
+        Returns:
+        dict: Per stage, its 'status' ('success', 'failed' or 'skipped'), 'duration' in seconds
+            and 'error' message if it raised.
+        """
+        self._check_graph()
+        summary = {}
+        pending = dict(self.stages)
+        running = {}
+        pool_class = ThreadPoolExecutor if self.executor == 'thread' else ProcessPoolExecutor
+
+        with pool_class(max_workers=self.max_workers) as pool:
+            while pending or running:
+                # Skip stages that can no longer run and submit those whose dependencies succeeded
+                for name, (func, depends_on) in list(pending.items()):
+                    statuses = [summary[dep]['status'] for dep in depends_on if dep in summary]
+                    if any(status != 'success' for status in statuses):
+                        summary[name] = {'status': 'skipped', 'duration': 0.0, 'error': None}
+                        logging.warning(f"Skipping stage '{name}' because a dependency did not succeed.")
+                        del pending[name]
+                    elif len(statuses) == len(depends_on):
+                        logging.info(f"Starting stage '{name}'.")
+                        running[pool.submit(_timed_call, func)] = name
+                        del pending[name]
+
+                if not running:
+                    continue
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    result, duration, error = future.result()
+                    status = 'failed' if error is not None or result is False else 'success'
+                    summary[name] = {'status': status, 'duration': duration, 'error': error}
+                    if error is not None:
+                        logging.error(f"Stage '{name}' raised an error: {error}")
+                    logging.info(f"Stage '{name}' finished with status '{summary[name]['status']}'.")
+
+        return summary
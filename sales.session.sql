@@ -1,3 +1,10 @@
+/**
+Tables loaded through DatabaseConnector.upload_to_db are now created with these final column
+types (schema.COLUMN_TYPES), and their primary keys, foreign keys and indexes are added after the
+load (schema.add_constraints). The ALTER TABLE statements below are only needed for tables loaded
+before that change.
+**/
+
 SELECT
   MAX(LENGTH(card_number)) AS max_card_number_length, --19
   MAX(LENGTH(store_code)) AS max_store_code_length, --12
@@ -209,6 +216,12 @@ FOREIGN KEY (product_code)
 REFERENCES dim_products(product_code)
 ON DELETE CASCADE;
 
+/**
+Orders whose keys are missing from the dimension tables are now set aside before the upload
+(integrity.ReferentialIntegrity) and written to .etl_quarantine/orders_table, so the foreign keys
+above can be added. The queries below find orphans loaded before that change.
+**/
+
 SELECT DISTINCT product_code
 FROM orders_table
 WHERE product_code NOT IN (SELECT product_code FROM dim_products);
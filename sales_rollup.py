@@ -0,0 +1,279 @@
+import logging
+import pandas as pd
+from sqlalchemy import BigInteger, Column, Float, MetaData, SmallInteger, String, Table, inspect, text
+from sqlalchemy.exc import SQLAlchemyError
+
+# Grain of the pre-aggregated sales facts
+GRAIN = ['year', 'month', 'store_type', 'country_code']
+MEASURES = ['total_sales', 'order_count', 'product_quantity']
+
+# Grain values of orders without a matching date or store. Each query filters out only the dimension
+# it joins on, so its results match the inner joins of the SQL queries.
+NO_DATE = 0
+NO_STORE = ''
+
+
+def aggregate_sales(orders, products, stores, dates):
+    """
+    Aggregates orders to sales facts at (year, month, store_type, country_code) grain.
+
+    Orders without a matching date or store are kept under the NO_DATE/NO_STORE grain values, and
+    orders without a matching product add to the counts but not to the sales.
+
+    Args:
+    orders (pd.DataFrame): Cleaned orders with 'date_uuid', 'store_code', 'product_code' and 'product_quantity'.
+    products (pd.DataFrame): 'product_code' and 'product_price'.
+    stores (pd.DataFrame): 'store_code', 'store_type' and 'country_code'.
+    dates (pd.DataFrame): 'date_uuid', 'year' and 'month'.
+
+    Returns:
+    pd.DataFrame: One row per grain with 'total_sales', 'order_count' and 'product_quantity'.
+    """
+    facts = (orders[['date_uuid', 'store_code', 'product_code', 'product_quantity']]
+             .merge(products[['product_code', 'product_price']], on='product_code', how='left')
+             .merge(stores[['store_code', 'store_type', 'country_code']], on='store_code', how='left')
+             .merge(dates[['date_uuid', 'year', 'month']], on='date_uuid', how='left'))
+    facts['sales'] = facts['product_price'] * facts['product_quantity']
+    facts = facts.fillna({'year': NO_DATE, 'month': NO_DATE, 'store_type': NO_STORE, 'country_code': NO_STORE})
+
+    rollup = facts.groupby(GRAIN, as_index=False).agg(
+        total_sales=('sales', 'sum'),
+        order_count=('sales', 'size'),
+        product_quantity=('product_quantity', 'sum'),
+    )
+    return rollup.astype({'year': 'int64', 'month': 'int64', 'order_count': 'int64', 'product_quantity': 'int64'})
+
+
+def sales_by_month(rollup, limit=6):
+    """
+    Months with the highest sales, across all years.
+
+    Args:
+    rollup (pd.DataFrame): Sales facts from `aggregate_sales` or `SalesRollup.load`.
+    limit (int): Number of months to return (default 6).
+
+    Returns:
+    pd.DataFrame: 'total_sales' and 'month', highest first.
+    """
+    dated = rollup[rollup['month'] != NO_DATE]
+    result = dated.groupby('month', as_index=False)['total_sales'].sum()
+    result['total_sales'] = result['total_sales'].round(2)
+    return result.nlargest(limit, 'total_sales')[['total_sales', 'month']].reset_index(drop=True)
+
+
+def sales_by_channel(rollup):
+    """
+    Number of sales and products sold online ('Web Portal' stores) and offline.
+
+    Args:
+    rollup (pd.DataFrame): Sales facts.
+
+    Returns:
+    pd.DataFrame: 'numbers_of_sales', 'product_quantity_count' and 'location', fewest sales first.
+    """
+    in_store = rollup[rollup['store_type'] != NO_STORE]
+    location = in_store['store_type'].eq('Web Portal').map({True: 'Web', False: 'Offline'})
+    result = in_store.groupby(location.rename('location'))[['order_count', 'product_quantity']].sum().reset_index()
+    result = result.rename(columns={'order_count': 'numbers_of_sales', 'product_quantity': 'product_quantity_count'})
+    return result.sort_values('numbers_of_sales')[['numbers_of_sales', 'product_quantity_count', 'location']].reset_index(drop=True)
+
+
+def sales_by_store_type(rollup):
+    """
+    Sales and share of total sales per store type.
+
+    Args:
+    rollup (pd.DataFrame): Sales facts.
+
+    Returns:
+    pd.DataFrame: 'store_type', 'total_sales' and 'percentage_sales', largest share first.
+    """
+    in_store = rollup[rollup['store_type'] != NO_STORE]
+    result = in_store.groupby('store_type', as_index=False)['total_sales'].sum()
+    result['percentage_sales'] = (result['total_sales'] / result['total_sales'].sum() * 100).round(2)
+    result['total_sales'] = result['total_sales'].round(2)
+    return result.sort_values('percentage_sales', ascending=False).reset_index(drop=True)
+
+
+def best_month_per_year(rollup, limit=10):
+    """
+    The month with the highest sales in each year.
+
+    Args:
+    rollup (pd.DataFrame): Sales facts.
+    limit (int): Number of years to return (default 10).
+
+    Returns:
+    pd.DataFrame: 'total_sales', 'year' and 'month', highest sales first.
+    """
+    dated = rollup[rollup['year'] != NO_DATE]
+    monthly = dated.groupby(['year', 'month'], as_index=False)['total_sales'].sum()
+    best = monthly.loc[monthly.groupby('year')['total_sales'].idxmax()]
+    best = best.assign(total_sales=best['total_sales'].round(2))
+    return best.nlargest(limit, 'total_sales')[['total_sales', 'year', 'month']].reset_index(drop=True)
+
+
+def store_type_sales(rollup, country_code='DE'):
+    """
+    Sales per store type within one country.
+
+    Args:
+    rollup (pd.DataFrame): Sales facts.
+    country_code (str): The country to report on (default 'DE').
+
+    Returns:
+    pd.DataFrame: 'total_sales' and 'store_type', lowest sales first.
+    """
+    in_country = rollup[rollup['country_code'] == country_code]
+    result = in_country.groupby('store_type', as_index=False)['total_sales'].sum()
+    result['total_sales'] = result['total_sales'].round(2)
+    return result.sort_values('total_sales')[['total_sales', 'store_type']].reset_index(drop=True)
+
+
+class SalesRollup:
+    """
+    Pre-aggregated sales facts stored in the sales database at (year, month, store_type, country_code)
+    grain, maintained incrementally as order batches are loaded.
+
+    The milestone queries are answered from this table, which holds a few thousand rows, instead of
+    joining all of `orders_table` with its dimensions.
+    """
+
+    def __init__(self, engine, table_name='sales_rollup'):
+        """
+        Args:
+        engine (Engine): SQLAlchemy engine of the sales database.
+        table_name (str): Name of the rollup table (default 'sales_rollup').
+        """
+        self.engine = engine
+        self.table_name = table_name
+        self.table = Table(
+            table_name, MetaData(),
+            Column('year', SmallInteger, primary_key=True),
+            Column('month', SmallInteger, primary_key=True),
+            Column('store_type', String(255), primary_key=True),
+            Column('country_code', String(3), primary_key=True),
+            Column('total_sales', Float, nullable=False),
+            Column('order_count', BigInteger, nullable=False),
+            Column('product_quantity', BigInteger, nullable=False),
+        )
+        self._dimensions = None
+
+    def exists(self):
+        """
+        Returns:
+        bool: True if the rollup table exists.
+        """
+        return inspect(self.engine).has_table(self.table_name)
+
+    def _load_dimensions(self):
+        """
+        Reads the dimension columns needed to aggregate orders, once per instance.
+        """
+        if self._dimensions is None:
+            self._dimensions = {
+                'products': pd.read_sql(text('SELECT product_code, product_price FROM dim_products'), self.engine),
+                'stores': pd.read_sql(text('SELECT store_code, store_type, country_code FROM dim_store_details'), self.engine),
+                'dates': pd.read_sql(text('SELECT date_uuid, year, month FROM dim_date_times'), self.engine),
+            }
+            # UUIDs may come back as uuid.UUID objects depending on the driver
+            self._dimensions['dates']['date_uuid'] = self._dimensions['dates']['date_uuid'].astype(str)
+        return self._dimensions
+
+    def merge_batch(self, orders_df):
+        """
+        Adds a newly loaded batch of orders to the rollup, creating the table if needed.
+
+        Each affected grain row is updated with a single additive upsert, so only the batch is read.
+        Call it once per loaded batch; merging the same batch twice counts it twice.
+
+        Args:
+        orders_df (pd.DataFrame): The cleaned orders that were just loaded.
+
+        Returns:
+        bool: True if the rollup was updated, False otherwise.
+        """
+        try:
+            dimensions = self._load_dimensions()
+            batch = orders_df.assign(date_uuid=orders_df['date_uuid'].astype(str))
+            rollup = aggregate_sales(batch, dimensions['products'], dimensions['stores'], dimensions['dates'])
+            if rollup.empty:
+                return True
+
+            columns = ', '.join(GRAIN + MEASURES)
+            values = ', '.join(f':{name}' for name in GRAIN + MEASURES)
+            updates = ', '.join(f'{name} = {self.table_name}.{name} + EXCLUDED.{name}' for name in MEASURES)
+            statement = text(f'INSERT INTO {self.table_name} ({columns}) VALUES ({values}) '
+                             f'ON CONFLICT ({", ".join(GRAIN)}) DO UPDATE SET {updates}')
+
+            self.table.create(self.engine, checkfirst=True)
+            with self.engine.begin() as connection:
+                connection.execute(statement, rollup.to_dict('records'))
+            logging.info(f"Merged {len(orders_df)} orders into {len(rollup)} rows of '{self.table_name}'.")
+            return True
+
+        except SQLAlchemyError as e:
+            logging.error(f"Error while merging orders into '{self.table_name}': {e}")
+        except Exception as e:
+            logging.error(f"An unexpected error occurred: {e}")
+        return False
+
+    def rebuild(self):
+        """
+        Recomputes the whole rollup from `orders_table` and its dimensions in one transaction,
+        e.g. to backfill orders loaded before the rollup existed.
+
+        Returns:
+        bool: True if the rollup was rebuilt, False otherwise.
+        """
+        columns = ', '.join(GRAIN + MEASURES)
+        try:
+            self.table.create(self.engine, checkfirst=True)
+            with self.engine.begin() as connection:
+                connection.execute(text(f'DELETE FROM {self.table_name}'))
+                connection.execute(text(f'''
+                    INSERT INTO {self.table_name} ({columns})
+                    SELECT COALESCE(d.year, :no_date), COALESCE(d.month, :no_date),
+                           COALESCE(s.store_type, :no_store), COALESCE(s.country_code, :no_store),
+                           COALESCE(SUM(p.product_price * o.product_quantity), 0), COUNT(*), SUM(o.product_quantity)
+                    FROM orders_table AS o
+                    LEFT JOIN dim_products AS p ON p.product_code = o.product_code
+                    LEFT JOIN dim_store_details AS s ON s.store_code = o.store_code
+                    LEFT JOIN dim_date_times AS d ON d.date_uuid = o.date_uuid
+                    GROUP BY 1, 2, 3, 4
+                '''), {'no_date': NO_DATE, 'no_store': NO_STORE})
+            logging.info(f"Rebuilt '{self.table_name}' from 'orders_table'.")
+            return True
+
+        except SQLAlchemyError as e:
+            logging.error(f"Error while rebuilding '{self.table_name}': {e}")
+        return False
+
+    def load(self):
+        """
+        Reads the rollup table.
+
+        Returns:
+        pd.DataFrame: The sales facts, one row per grain.
+        """
+        return pd.read_sql(text(f'SELECT {", ".join(GRAIN + MEASURES)} FROM {self.table_name}'), self.engine)
+
+    def sales_by_month(self, limit=6):
+        """Months with the highest sales; see the module-level `sales_by_month`."""
+        return sales_by_month(self.load(), limit)
+
+    def sales_by_channel(self):
+        """Online vs offline sales; see the module-level `sales_by_channel`."""
+        return sales_by_channel(self.load())
+
+    def sales_by_store_type(self):
+        """Sales share per store type; see the module-level `sales_by_store_type`."""
+        return sales_by_store_type(self.load())
+
+    def best_month_per_year(self, limit=10):
+        """Best month of each year; see the module-level `best_month_per_year`."""
+        return best_month_per_year(self.load(), limit)
+
+    def store_type_sales(self, country_code='DE'):
+        """Sales per store type in one country; see the module-level `store_type_sales`."""
+        return store_type_sales(self.load(), country_code)
@@ -0,0 +1,305 @@
+import re
+import logging
+import pandas as pd
+from sqlalchemy import (BigInteger, Boolean, Column, Date, DateTime, Float, Integer, MetaData, SmallInteger,
+                        String, Table, Text, inspect, text)
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.exc import SQLAlchemyError
+
+# Natural keys of the star schema tables, used as primary keys and to merge reloads instead of
+# appending duplicates
+NATURAL_KEYS = {
+    'dim_users': 'user_uuid',
+    'dim_card_details': 'card_number',
+    'dim_store_details': 'store_code',
+    'dim_products': 'product_code',
+    'dim_date_times': 'date_uuid',
+}
+
+# Foreign keys of the fact table: column -> referenced dimension table (on its natural key)
+FOREIGN_KEYS = {
+    'orders_table': {
+        'date_uuid': 'dim_date_times',
+        'user_uuid': 'dim_users',
+        'card_number': 'dim_card_details',
+        'store_code': 'dim_store_details',
+        'product_code': 'dim_products',
+    },
+}
+
+# Final column types of the star schema tables (previously applied with ALTER TABLE in sales.session.sql).
+# 'varchar' is sized to the longest value found when the table is created, 'varchar(n)' has a fixed
+# length and 'smallint' widens to INTEGER/BIGINT if the values do not fit. Other columns get a type
+# inferred from their dtype.
+COLUMN_TYPES = {
+    'orders_table': {
+        'date_uuid': 'uuid',
+        'user_uuid': 'uuid',
+        'card_number': 'varchar',
+        'store_code': 'varchar',
+        'product_code': 'varchar',
+        'product_quantity': 'smallint',
+    },
+    'dim_users': {
+        'first_name': 'varchar(255)',
+        'last_name': 'varchar(255)',
+        'date_of_birth': 'date',
+        'country_code': 'varchar',
+        'user_uuid': 'uuid',
+        'join_date': 'date',
+    },
+    'dim_store_details': {
+        'longitude': 'float',
+        'latitude': 'float',
+        'locality': 'varchar(255)',
+        'store_code': 'varchar',
+        'staff_numbers': 'smallint',
+        'opening_date': 'date',
+        'store_type': 'varchar(255)',
+        'country_code': 'varchar',
+        'continent': 'varchar(255)',
+    },
+    'dim_products': {
+        'product_price': 'float',
+        'weight': 'float',
+        'EAN': 'varchar',
+        'product_code': 'varchar',
+        'date_added': 'date',
+        'uuid': 'uuid',
+    },
+    'dim_date_times': {
+        'month': 'smallint',
+        'year': 'smallint',
+        'day': 'smallint',
+        'time_period': 'varchar',
+        'date_uuid': 'uuid',
+    },
+    'dim_card_details': {
+        'card_number': 'varchar',
+        'expiry_date': 'date',
+        'date_payment_confirmed': 'date',
+    },
+}
+
+# Signed ranges of the integer column types, narrowest first
+INTEGER_TYPES = [
+    (SmallInteger, -2 ** 15, 2 ** 15 - 1),
+    (Integer, -2 ** 31, 2 ** 31 - 1),
+    (BigInteger, -2 ** 63, 2 ** 63 - 1),
+]
+
+
+def profile_columns(df):
+    """
+    Profiles every column of a DataFrame in one pass: longest text value and numeric range.
+
+    Args:
+    df (pd.DataFrame): The cleaned data.
+
+    Returns:
+    dict: Column name to a dict with 'dtype', 'max_length', 'min' and 'max'.
+    """
+    profiles = {}
+    for name in df.columns:
+        column = df[name]
+        profile = {'dtype': column.dtype, 'max_length': None, 'min': None, 'max': None}
+        values = column.dropna()
+
+        if pd.api.types.is_bool_dtype(column) or pd.api.types.is_datetime64_any_dtype(column):
+            pass
+        elif pd.api.types.is_numeric_dtype(column):
+            if not values.empty:
+                profile['min'], profile['max'] = values.min(), values.max()
+        else:
+            # Measure each distinct value only once
+            lengths = pd.Series(values.unique()).astype(str).str.len()
+            profile['max_length'] = int(lengths.max()) if not lengths.empty else 0
+        profiles[name] = profile
+    return profiles
+
+
+def _integer_type(profile):
+    """
+    Returns the narrowest integer type that holds the profiled range.
+    """
+    low = profile['min'] if profile['min'] is not None else 0
+    high = profile['max'] if profile['max'] is not None else 0
+    for sql_type, type_min, type_max in INTEGER_TYPES:
+        if type_min <= low and high <= type_max:
+            return sql_type()
+    return BigInteger()
+
+
+def column_type(kind, profile):
+    """
+    Maps a declared kind, or the profile of an undeclared column, to a SQLAlchemy type.
+
+    Args:
+    kind (str): Entry from COLUMN_TYPES, or None to infer the type from the profile.
+    profile (dict): The column's profile from `profile_columns`.
+
+    Returns:
+    TypeEngine: The column type.
+    """
+    if kind == 'uuid':
+        # Native UUID on PostgreSQL, the 36-character text form elsewhere
+        return String(36).with_variant(postgresql.UUID(as_uuid=False), 'postgresql')
+    if kind == 'date':
+        return Date()
+    if kind == 'float':
+        return Float()
+    if kind == 'smallint':
+        return _integer_type(profile)
+    if kind == 'varchar':
+        return String(max(1, profile['max_length'] or 0))
+    if kind is not None:
+        match = re.fullmatch(r'varchar\((\d+)\)', kind)
+        if match is None:
+            raise ValueError(f"Unknown column type '{kind}'.")
+        return String(int(match.group(1)))
+
+    dtype = profile['dtype']
+    if pd.api.types.is_bool_dtype(dtype):
+        return Boolean()
+    if pd.api.types.is_datetime64_any_dtype(dtype):
+        return DateTime()
+    if pd.api.types.is_integer_dtype(dtype):
+        # Undeclared counters such as 'index' keep growing with later loads, so they are not narrowed
+        return BigInteger()
+    if pd.api.types.is_float_dtype(dtype):
+        return Float()
+    return Text()
+
+
+def build_table(df, table_name, metadata=None):
+    """
+    Builds the SQLAlchemy table for a cleaned DataFrame with its final column types.
+
+    Args:
+    df (pd.DataFrame): The cleaned data.
+    table_name (str): The target table.
+    metadata (MetaData): Metadata to attach the table to (default a new MetaData).
+
+    Returns:
+    Table: The table definition, without keys or indexes.
+    """
+    declared = COLUMN_TYPES.get(table_name, {})
+    profiles = profile_columns(df)
+    columns = [Column(name, column_type(declared.get(name), profiles[name])) for name in df.columns]
+    return Table(table_name, metadata if metadata is not None else MetaData(), *columns)
+
+
+def conform_frame(df, table_name):
+    """
+    Converts whole-number float columns declared as integers to a nullable integer dtype, so they
+    load as '3' rather than '3.0'.
+
+    Args:
+    df (pd.DataFrame): The cleaned data.
+    table_name (str): The target table.
+
+    Returns:
+    pd.DataFrame: The DataFrame with converted columns, or the original if nothing changed.
+    """
+    declared = COLUMN_TYPES.get(table_name, {})
+    converted = {}
+    for name, kind in declared.items():
+        if kind != 'smallint' or name not in df.columns or not pd.api.types.is_float_dtype(df[name]):
+            continue
+        values = df[name].dropna()
+        if (values % 1 == 0).all():
+            converted[name] = df[name].astype('Int64')
+    return df.assign(**converted) if converted else df
+
+
+def create_table(df, table_name, engine):
+    """
+    Creates a table with the final types of a cleaned DataFrame's columns, sized from a single
+    profiling pass, so the data can be bulk-loaded without later type changes.
+
+    Args:
+    df (pd.DataFrame): The cleaned data.
+    table_name (str): The table to create.
+    engine (Engine): The SQLAlchemy engine.
+
+    Returns:
+    Table: The created table.
+    """
+    table = build_table(df, table_name)
+    table.create(engine, checkfirst=True)
+    logging.info(f"Created table '{table_name}' with columns: "
+                 + ', '.join(f"{column.name} {column.type.compile(engine.dialect)}" for column in table.columns))
+    return table
+
+
+def widen_columns(df, table_name, engine):
+    """
+    Widens VARCHAR columns of an existing table that are too short for a new batch, e.g. when a
+    table created from its first chunk receives longer values in a later one. Widening a VARCHAR
+    does not rewrite the table in PostgreSQL; SQLite does not enforce lengths and is skipped.
+
+    Args:
+    df (pd.DataFrame): The batch about to be loaded.
+    table_name (str): The existing table.
+    engine (Engine): The SQLAlchemy engine.
+    """
+    if engine.dialect.name == 'sqlite':
+        return
+
+    lengths = {column['name']: column['type'].length for column in inspect(engine).get_columns(table_name)
+               if isinstance(column['type'], String) and column['type'].length}
+    profiles = profile_columns(df[[name for name in df.columns if name in lengths]])
+    with engine.begin() as connection:
+        for name, profile in profiles.items():
+            if profile['max_length'] is not None and profile['max_length'] > lengths[name]:
+                connection.execute(text(f'ALTER TABLE "{table_name}" ALTER COLUMN "{name}" TYPE VARCHAR({profile["max_length"]})'))
+                logging.info(f"Widened '{table_name}.{name}' to VARCHAR({profile['max_length']}).")
+
+
+def add_constraints(table_name, engine):
+    """
+    Adds the primary key, foreign keys and foreign-key indexes of a table, once its data is loaded.
+
+    Building them after the bulk load is much cheaper than maintaining them row by row. SQLite
+    cannot add constraints to an existing table, so it gets a unique index on the key instead
+    (enough for merges) and no foreign keys.
+
+    Args:
+    table_name (str): The loaded table.
+    engine (Engine): The SQLAlchemy engine.
+
+    Returns:
+    bool: True if every constraint and index exists afterwards, False otherwise.
+    """
+    inspector = inspect(engine)
+    if not inspector.has_table(table_name):
+        logging.error(f"Cannot add constraints: table '{table_name}' does not exist.")
+        return False
+
+    statements = []
+    key = NATURAL_KEYS.get(table_name)
+    if key is not None and not inspector.get_pk_constraint(table_name).get('constrained_columns'):
+        if engine.dialect.name == 'sqlite':
+            statements.append(f'CREATE UNIQUE INDEX IF NOT EXISTS "pk_{table_name}" ON "{table_name}" ("{key}")')
+        else:
+            statements.append(f'ALTER TABLE "{table_name}" ADD PRIMARY KEY ("{key}")')
+
+    existing_foreign_keys = {fk['name'] for fk in inspector.get_foreign_keys(table_name)}
+    for column, dimension in FOREIGN_KEYS.get(table_name, {}).items():
+        if engine.dialect.name != 'sqlite' and f'fk_{column}' not in existing_foreign_keys:
+            statements.append(f'ALTER TABLE "{table_name}" ADD CONSTRAINT "fk_{column}" FOREIGN KEY ("{column}") '
+                              f'REFERENCES "{dimension}" ("{NATURAL_KEYS[dimension]}") ON DELETE CASCADE')
+        # Joins from the fact table to its dimensions look rows up by these columns
+        statements.append(f'CREATE INDEX IF NOT EXISTS "ix_{table_name}_{column}" ON "{table_name}" ("{column}")')
+
+    success = True
+    for statement in statements:
+        try:
+            with engine.begin() as connection:
+                connection.execute(text(statement))
+        except SQLAlchemyError as e:
+            logging.error(f"Could not add constraint to '{table_name}': {e}")
+            success = False
+    if success and statements:
+        logging.info(f"Added keys and indexes to '{table_name}'.")
+    return success
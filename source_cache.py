@@ -0,0 +1,181 @@
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+import pandas as pd
+
+
+def http_validator(headers):
+    """
+    Extracts the cache validator from HTTP response headers.
+
+    Args:
+    headers (Mapping): Response headers.
+
+    Returns:
+    dict: The 'etag' and/or 'last_modified' values, empty if the server sent neither.
+    """
+    validator = {}
+    if headers.get('ETag'):
+        validator['etag'] = headers['ETag']
+    if headers.get('Last-Modified'):
+        validator['last_modified'] = headers['Last-Modified']
+    return validator
+
+
+def conditional_headers(validator):
+    """
+    Builds conditional request headers from a stored validator.
+
+    Args:
+    validator (dict): A validator as returned by `http_validator`, or None.
+
+    Returns:
+    dict: 'If-None-Match' and/or 'If-Modified-Since' headers.
+    """
+    headers = {}
+    if validator and validator.get('etag'):
+        headers['If-None-Match'] = validator['etag']
+    if validator and validator.get('last_modified'):
+        headers['If-Modified-Since'] = validator['last_modified']
+    return headers
+
+
+class SourceCache:
+    """
+    Size-bounded, content-addressed on-disk cache of parsed remote sources.
+
+    Entries are keyed on the source URL plus its validator (ETag, Last-Modified or a content hash)
+    and stored as Parquet files, so a warm run skips both the download and the parse.
+    The least recently used entries are evicted once the cache grows past `max_bytes`.
+    """
+
+    def __init__(self, cache_dir='.etl_cache', max_bytes=512 * 1024 ** 2):
+        """
+        Args:
+        cache_dir (str): Directory for the cached files and index (default '.etl_cache').
+        max_bytes (int): Maximum total size of the cached files (default 512 MiB).
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.index_path = os.path.join(cache_dir, 'index.json')
+        self._lock = threading.Lock()
+
+    def _load_index(self):
+        try:
+            with open(self.index_path, 'r') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except json.JSONDecodeError as e:
+            logging.error(f"Could not parse cache index '{self.index_path}': {e}")
+            return {}
+
+    def _save_index(self, index):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_path = f"{self.index_path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(index, f, indent=2)
+        os.replace(tmp_path, self.index_path)
+
+    def _remove(self, index, url):
+        entry = index.pop(url)
+        try:
+            os.remove(os.path.join(self.cache_dir, entry['file']))
+        except FileNotFoundError:
+            pass
+
+    def validator(self, url):
+        """
+        Returns the validator stored for a URL.
+
+        Args:
+        url (str): The source URL.
+
+        Returns:
+        dict: The stored validator, or None if the URL is not cached.
+        """
+        with self._lock:
+            entry = self._load_index().get(url)
+        return entry['validator'] if entry else None
+
+    def load(self, url, validator=None):
+        """
+        Loads the cached DataFrame for a URL and marks it as recently used.
+
+        Args:
+        url (str): The source URL.
+        validator (dict): If given, the entry is only returned when its validator matches.
+
+        Returns:
+        pd.DataFrame: The cached data, or None on a cache miss.
+        """
+        with self._lock:
+            index = self._load_index()
+            entry = index.get(url)
+            if entry is None or (validator is not None and entry['validator'] != validator):
+                return None
+
+            path = os.path.join(self.cache_dir, entry['file'])
+            try:
+                df = pd.read_parquet(path) if path.endswith('.parquet') else pd.read_pickle(path)
+            except Exception as e:
+                logging.error(f"Could not read cached data for '{url}': {e}")
+                self._remove(index, url)
+                self._save_index(index)
+                return None
+
+            entry['last_access'] = time.time()
+            self._save_index(index)
+
+        logging.info(f"Loaded '{url}' from the local cache.")
+        return df
+
+    def store(self, url, validator, df):
+        """
+        Stores a parsed DataFrame for a URL, replacing any older version, and evicts
+        least recently used entries beyond the size limit.
+
+        Args:
+        url (str): The source URL.
+        validator (dict): The validator of the downloaded version. If empty, a content hash of
+            the data is used so the entry can still be verified.
+        df (pd.DataFrame): The parsed data.
+        """
+        if not validator:
+            validator = {'content_hash': hashlib.sha256(pd.util.hash_pandas_object(df).values.tobytes()).hexdigest()}
+        key = hashlib.sha256(json.dumps([url, validator], sort_keys=True).encode()).hexdigest()[:32]
+
+        with self._lock:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            try:
+                file_name = f"{key}.parquet"
+                df.to_parquet(os.path.join(self.cache_dir, file_name))
+            except Exception as e:
+                # Columns mixing Python types cannot be represented in Arrow; keep them as a pickle
+                logging.info(f"Caching '{url}' as a pickle because Parquet failed: {e}")
+                file_name = f"{key}.pkl"
+                df.to_pickle(os.path.join(self.cache_dir, file_name))
+
+            index = self._load_index()
+            if url in index and index[url]['file'] != file_name:
+                self._remove(index, url)
+            index[url] = {
+                'validator': validator,
+                'file': file_name,
+                'size': os.path.getsize(os.path.join(self.cache_dir, file_name)),
+                'last_access': time.time(),
+            }
+
+            # Evict the least recently used entries until the cache fits its size limit
+            total_size = sum(entry['size'] for entry in index.values())
+            for old_url in sorted(index, key=lambda u: index[u]['last_access']):
+                if total_size <= self.max_bytes or old_url == url:
+                    continue
+                total_size -= index[old_url]['size']
+                self._remove(index, old_url)
+                logging.info(f"Evicted '{old_url}' from the local cache.")
+
+            self._save_index(index)
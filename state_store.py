@@ -0,0 +1,85 @@
+import os
+import json
+import logging
+import threading
+
+
+class WatermarkStore:
+    """
+    Persists per-table extraction watermarks in a local JSON file.
+
+    A watermark is the highest value of a monotonic column (e.g. an index or a timestamp)
+    that has been loaded successfully, so the next run only needs rows beyond it.
+    """
+
+    def __init__(self, path=os.path.join('.etl_state', 'watermarks.json')):
+        """
+        Args:
+        path (str): Location of the JSON state file (default '.etl_state/watermarks.json').
+        """
+        self.path = path
+        self._lock = threading.Lock()
+
+    def _load(self):
+        try:
+            with open(self.path, 'r') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except json.JSONDecodeError as e:
+            logging.error(f"Could not parse watermark file '{self.path}': {e}")
+            return {}
+
+    def _save(self, state):
+        # Write to a temporary file first so a crash never leaves a half-written state file
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(state, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+    def get(self, table_name):
+        """
+        Returns the stored watermark for a table.
+
+        Args:
+        table_name (str): The source table name.
+
+        Returns:
+        The last committed watermark value, or None if the table has not been loaded yet.
+        """
+        with self._lock:
+            return self._load().get(table_name)
+
+    def advance(self, table_name, value):
+        """
+        Stores a new watermark for a table. Call this only after the load has succeeded.
+
+        Args:
+        table_name (str): The source table name.
+        value: The new high-water mark. numpy scalars and timestamps are converted to JSON types.
+        """
+        if value is None:
+            return
+        if hasattr(value, 'isoformat'):
+            value = value.isoformat()
+        elif hasattr(value, 'item'):
+            value = value.item()
+
+        with self._lock:
+            state = self._load()
+            state[table_name] = value
+            self._save(state)
+        logging.info(f"Advanced watermark for '{table_name}' to {value}.")
+
+    def reset(self, table_name):
+        """
+        Removes the watermark for a table so the next run extracts it in full.
+
+        Args:
+        table_name (str): The source table name.
+        """
+        with self._lock:
+            state = self._load()
+            if state.pop(table_name, None) is not None:
+                self._save(state)
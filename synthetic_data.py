@@ -0,0 +1,275 @@
+import uuid
+import numpy as np
+import pandas as pd
+
+# Row counts of the real sources; every table is scaled from these
+BASE_ROWS = {
+    'legacy_users': 15320,
+    'card_details': 15309,
+    'store_details': 451,
+    'products': 1853,
+    'date_details': 120161,
+    'orders_table': 120123,
+}
+
+COUNTRIES = [('United Kingdom', 'GB'), ('Germany', 'DE'), ('United States', 'US')]
+CONTINENTS = {'GB': 'Europe', 'DE': 'Europe', 'US': 'America'}
+STORE_TYPES = ['Local', 'Super Store', 'Mall Kiosk', 'Outlet']
+CARD_PROVIDERS = ['VISA 16 digit', 'JCB 16 digit', 'Mastercard', 'American Express', 'Discover', 'Maestro']
+CATEGORIES = ['toys-and-games', 'sports-and-leisure', 'pets', 'homeware', 'health-and-beauty',
+              'food-and-drink', 'diy']
+TIME_PERIODS = ['Morning', 'Midday', 'Evening', 'Late_Hours']
+
+
+class SyntheticDataGenerator:
+    """
+    Deterministic generator of raw data shaped like each remote source, including its dirt:
+    'NULL' rows, junk rows, '?' prefixes, mixed date formats, multipack weights and typos.
+
+    Each table is generated from its own seeded stream, so results do not depend on the order
+    in which tables are requested. Orders reference keys of the generated dimension tables.
+    """
+
+    def __init__(self, scale=1.0, seed=0, null_rate=0.01, junk_rate=0.01, orphan_rate=0.001):
+        """
+        Args:
+        scale (float): Multiplier applied to the real row counts in BASE_ROWS (default 1.0).
+        seed (int): Seed for the random streams (default 0).
+        null_rate (float): Share of rows whose values are all the string 'NULL' (default 0.01).
+        junk_rate (float): Share of rows filled with random 10-character strings (default 0.01).
+        orphan_rate (float): Share of orders whose product_code matches no product (default 0.001).
+        """
+        self.scale = scale
+        self.seed = seed
+        self.null_rate = null_rate
+        self.junk_rate = junk_rate
+        self.orphan_rate = orphan_rate
+        self._tables = {}
+
+    def _rng(self, table_name):
+        return np.random.default_rng([self.seed, list(BASE_ROWS).index(table_name)])
+
+    def rows(self, table_name):
+        """
+        Returns the number of rows generated for a table at the current scale.
+
+        Args:
+        table_name (str): A key of BASE_ROWS.
+
+        Returns:
+        int: The row count, at least 1.
+        """
+        return max(1, int(BASE_ROWS[table_name] * self.scale))
+
+    def _cached(self, table_name, build):
+        if table_name not in self._tables:
+            self._tables[table_name] = build(self._rng(table_name), self.rows(table_name))
+        return self._tables[table_name].copy()
+
+    @staticmethod
+    def _uuids(rng, n):
+        raw = rng.integers(0, 256, size=(n, 16), dtype=np.uint8)
+        return [str(uuid.UUID(bytes=row.tobytes(), version=4)) for row in raw]
+
+    @staticmethod
+    def _codes(rng, prefix_letters, n, digits):
+        prefixes = rng.choice(list(prefix_letters), size=n)
+        numbers = rng.integers(10 ** (digits - 1), 10 ** digits, size=n).astype(str)
+        return np.char.add(np.char.add(prefixes.astype(str), '-'), numbers)
+
+    @staticmethod
+    def _mixed_dates(rng, n, start, end):
+        """
+        Random dates spread over four layouts: ISO, '%Y %B %d', '%B %Y %d' and '%Y/%m/%d'.
+        """
+        days = rng.integers(pd.Timestamp(start).value // 86400_000_000_000,
+                            pd.Timestamp(end).value // 86400_000_000_000, size=n)
+        dates = pd.Series(pd.to_datetime(days, unit='D'))
+        layouts = ['%Y-%m-%d', '%Y %B %d', '%B %Y %d', '%Y/%m/%d']
+        weights = [0.85, 0.05, 0.05, 0.05]
+        choice = rng.choice(len(layouts), size=n, p=weights)
+        formatted = pd.Series(index=dates.index, dtype=object)
+        for i, layout in enumerate(layouts):
+            mask = choice == i
+            formatted[mask] = dates[mask].dt.strftime(layout)
+        return formatted.to_numpy(dtype=object)
+
+    def _dirty(self, rng, df, protected=()):
+        """
+        Replaces a share of rows with 'NULL' strings and another share with junk strings.
+        """
+        n = len(df)
+        roll = rng.random(n)
+        null_rows = roll < self.null_rate
+        junk_rows = (roll >= self.null_rate) & (roll < self.null_rate + self.junk_rate)
+        alphabet = np.array(list('ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789'))
+        for name in df.columns:
+            if name in protected:
+                continue
+            column = df[name].astype(object)
+            column[null_rows] = 'NULL'
+            junk = rng.choice(alphabet, size=(int(junk_rows.sum()), 10))
+            column[junk_rows] = [''.join(chars) for chars in junk]
+            df[name] = column
+        return df
+
+    def legacy_users(self):
+        """
+        Returns a DataFrame shaped like the RDS 'legacy_users' table.
+        """
+        def build(rng, n):
+            countries = rng.integers(0, len(COUNTRIES), size=n)
+            first_names = rng.choice(['Sigfried', 'Guy', 'Harry', 'Darren', 'Garry', 'Anna', 'Lena', 'Ruth'], size=n)
+            last_names = rng.choice(['Noack', 'Allen', 'Lawrence', 'Hussain', 'Stone', 'Weiss', 'Kay'], size=n)
+            email_ids = rng.integers(0, max(2, int(n * 0.98)), size=n)  # a few duplicate emails
+            df = pd.DataFrame({
+                'index': np.arange(n),
+                'first_name': first_names,
+                'last_name': last_names,
+                'date_of_birth': self._mixed_dates(rng, n, '1940-01-01', '2006-01-01'),
+                'company': rng.choice(['Heydrich Junitz KG', 'Richards-Wilson', 'Morgan Ltd'], size=n),
+                'email_address': np.char.add(np.char.add(np.char.lower(first_names.astype(str)), email_ids.astype(str)),
+                                             '@example.com'),
+                'address': rng.choice(['Zimmerstr. 1/0\n59015 Gießen', '3 Gardner Lane\nLondon', '1 Main St\nNew York'], size=n),
+                'country': [COUNTRIES[c][0] for c in countries],
+                'country_code': [COUNTRIES[c][1] for c in countries],
+                'phone_number': rng.choice(['+49(0) 047905356', '(0161) 496 0674', '001-645-735-4226x617', '0306079713'], size=n),
+                'join_date': self._mixed_dates(rng, n, '1992-01-01', '2022-06-01'),
+                'user_uuid': self._uuids(rng, n),
+            })
+            # The country code typo 'GGB' appears in the source
+            df.loc[rng.random(n) < 0.005, 'country_code'] = 'GGB'
+            return self._dirty(rng, df, protected=('index',))
+        return self._cached('legacy_users', build)
+
+    def card_details(self):
+        """
+        Returns a DataFrame shaped like the tables extracted from card_details.pdf.
+        """
+        def build(rng, n):
+            numbers = rng.integers(10 ** 13, 10 ** 16, size=n)
+            card_numbers = numbers.astype(object)
+            # Some card numbers come out of the PDF prefixed with '?' characters
+            prefixed = rng.random(n) < 0.02
+            card_numbers[prefixed] = [f"{'?' * rng.integers(1, 5)}{number}" for number in numbers[prefixed]]
+            expiry = [f"{m:02d}/{y:02d}" for m, y in zip(rng.integers(1, 13, size=n), rng.integers(22, 31, size=n))]
+            df = pd.DataFrame({
+                'card_number': card_numbers,
+                'expiry_date': expiry,
+                'card_provider': rng.choice(CARD_PROVIDERS, size=n),
+                'date_payment_confirmed': self._mixed_dates(rng, n, '1992-01-01', '2022-06-01'),
+            })
+            return self._dirty(rng, df)
+        return self._cached('card_details', build)
+
+    def store_details(self):
+        """
+        Returns a DataFrame shaped like the store details returned by the stores API.
+        The first store is the 'Web Portal', which has no coordinates.
+        """
+        def build(rng, n):
+            countries = rng.integers(0, len(COUNTRIES), size=n)
+            country_codes = np.array([COUNTRIES[c][1] for c in countries], dtype=object)
+            latitude = np.round(rng.uniform(-60, 60, size=n), 5).astype(str).astype(object)
+            longitude = np.round(rng.uniform(-120, 60, size=n), 5).astype(str).astype(object)
+            latitude[rng.random(n) < 0.01] = None
+            staff = rng.integers(1, 120, size=n).astype(str).astype(object)
+            # Some staff counts contain stray letters, e.g. 'J78' or '3n9'
+            typo = rng.random(n) < 0.02
+            staff[typo] = [f"J{value}" for value in staff[typo]]
+            df = pd.DataFrame({
+                'index': np.arange(n),
+                'address': rng.choice(['Flat 72W\nSally isle\nEast Deantown', '1 Main St\nChapletown'], size=n),
+                'longitude': longitude,
+                'lat': None,
+                'locality': rng.choice(['High Wycombe', 'Gainesville', 'Hamburg', 'Belper', 'Chapletown'], size=n),
+                'store_code': self._codes(rng, 'ABCDEFGH', n, 8).astype(object),
+                'staff_numbers': staff,
+                'opening_date': self._mixed_dates(rng, n, '1990-01-01', '2022-01-01'),
+                'store_type': rng.choice(STORE_TYPES, size=n),
+                'latitude': latitude,
+                'country_code': country_codes,
+                'continent': [CONTINENTS[code] for code in country_codes],
+            })
+            # The 'ee' prefix typo on continents appears in the source
+            typo = rng.random(n) < 0.02
+            df.loc[typo, 'continent'] = 'ee' + df.loc[typo, 'continent']
+            df.loc[0, ['store_code', 'store_type', 'longitude', 'latitude', 'lat', 'locality', 'address']] = \
+                ['WEB-1388012W', 'Web Portal', 'N/A', None, 'N/A', 'N/A', 'N/A']
+            return self._dirty(rng, df, protected=('index',))
+        return self._cached('store_details', build)
+
+    def products(self):
+        """
+        Returns a DataFrame shaped like products.csv, including multipack and mixed-unit weights.
+        """
+        def build(rng, n):
+            amounts = rng.integers(1, 1000, size=n).astype(str)
+            units = rng.choice(['g', 'kg', 'ml', 'oz', 'g .'], size=n, p=[0.55, 0.3, 0.08, 0.05, 0.02])
+            weights = np.char.add(amounts, units).astype(object)
+            multipack = rng.random(n) < 0.05
+            weights[multipack] = [f"{q} x {w}g" for q, w in zip(rng.integers(2, 20, size=multipack.sum()),
+                                                                rng.integers(5, 500, size=multipack.sum()))]
+            prices = np.round(rng.uniform(0.5, 1500, size=n), 2)
+            df = pd.DataFrame({
+                'Unnamed: 0': np.arange(n),
+                'product_name': rng.choice(['FurReal Dazzlin Dimples', 'Tiffany & Co', 'Dettol Spray'], size=n),
+                'product_price': [f"£{price:,.2f}" for price in prices],
+                'weight': weights,
+                'category': rng.choice(CATEGORIES, size=n),
+                'EAN': rng.integers(10 ** 11, 10 ** 13, size=n).astype(str),
+                'date_added': self._mixed_dates(rng, n, '1990-01-01', '2022-01-01'),
+                'uuid': self._uuids(rng, n),
+                'removed': rng.choice(['Still_avaliable', 'Removed'], size=n, p=[0.9, 0.1]),
+                'product_code': self._codes(rng, 'ABCDEFGH', n, 7).astype(object),
+            })
+            return self._dirty(rng, df, protected=('Unnamed: 0',))
+        return self._cached('products', build)
+
+    def date_details(self):
+        """
+        Returns a DataFrame shaped like date_details.json, with every column as strings.
+        """
+        def build(rng, n):
+            seconds = rng.integers(0, 86400, size=n)
+            df = pd.DataFrame({
+                'timestamp': [f"{s // 3600:02d}:{s // 60 % 60:02d}:{s % 60:02d}" for s in seconds],
+                'month': rng.integers(1, 13, size=n).astype(str),
+                'year': rng.integers(1992, 2023, size=n).astype(str),
+                'day': rng.integers(1, 29, size=n).astype(str),
+                'time_period': rng.choice(TIME_PERIODS, size=n),
+                'date_uuid': self._uuids(rng, n),
+            })
+            return self._dirty(rng, df)
+        return self._cached('date_details', build)
+
+    def orders_table(self):
+        """
+        Returns a DataFrame shaped like the RDS 'orders_table'. Keys are drawn from the generated
+        dimension tables, except for a share of orphans (`orphan_rate`) that match no product.
+        """
+        def build(rng, n):
+            users = self.legacy_users()['user_uuid'].to_numpy()
+            cards = self.card_details()['card_number'].astype(str).str.lstrip('?').to_numpy()
+            stores = self.store_details()['store_code'].to_numpy()
+            products = self.products()['product_code'].to_numpy().astype(object)
+            dates = self.date_details()['date_uuid'].to_numpy()
+
+            product_codes = rng.choice(products, size=n)
+            orphans = rng.random(n) < self.orphan_rate
+            product_codes[orphans] = self._codes(rng, 'XYZ', int(orphans.sum()), 7)
+            return pd.DataFrame({
+                'level_0': np.arange(n),
+                'index': np.arange(n),
+                # Orders map one-to-one onto date rows in the source
+                'date_uuid': dates[np.arange(n) % len(dates)],
+                'first_name': None,
+                'last_name': None,
+                'user_uuid': rng.choice(users, size=n),
+                'card_number': rng.choice(cards, size=n),
+                'store_code': rng.choice(stores, size=n),
+                'product_code': product_codes,
+                '1': None,
+                'product_quantity': rng.integers(1, 14, size=n),
+            })
+        return self._cached('orders_table', build)
@@ -0,0 +1,67 @@
+import re
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_cleaning import DataCleaning
+from synthetic_data import SyntheticDataGenerator
+
+UNIT_CONVERSION = {'g': 1 / 1000, 'kg': 1, 'ml': 1 / 1000, 'l': 1, 'oz': 0.0283495}
+
+
+def legacy_convert_weight(value):
+    # The per-row conversion that convert_product_weights applied before it was vectorized
+    if pd.isnull(value):
+        return None
+
+    value = value.strip().lower()
+
+    multi_weight_match = re.match(r"(\d+)\s*x\s*(\d+\.?\d*)\s*(g|kg|ml|l|oz)", value)
+    if multi_weight_match:
+        quantity = int(multi_weight_match.group(1))
+        weight_per_item = float(multi_weight_match.group(2))
+        unit = multi_weight_match.group(3)
+        return quantity * weight_per_item * UNIT_CONVERSION.get(unit, 1)
+
+    weight_match = re.match(r"(\d+\.?\d*)\s*(g|kg|ml|l|oz)", value)
+    if weight_match:
+        weight = float(weight_match.group(1))
+        unit = weight_match.group(2)
+        return weight * UNIT_CONVERSION.get(unit, 1)
+
+    return None
+
+
+def assert_matches_legacy(weights):
+    df = pd.DataFrame({'weight': pd.Series(weights, dtype=object)})
+    expected = df['weight'].apply(legacy_convert_weight).astype(float).to_numpy()
+    result = DataCleaning().convert_product_weights(df.copy())['weight'].to_numpy(dtype=float)
+    np.testing.assert_array_equal(result, expected)
+
+
+@pytest.mark.parametrize('weights', [
+    # Simple weights in every unit
+    ['500g', '2kg', '16oz', '250ml', '1l', '0.5kg', '1.kg', '77g .'],
+    # Multipacks, with and without spaces around the 'x'
+    ['16 x 10g', '3 x 2kg', '12x100ml', '2 x 1.5l', '6 x 2oz', '4 x  25 g'],
+    # Surrounding whitespace and upper case
+    ['  500g ', '2KG', ' 3 X 10G', '\t1L\n', '16 OZ', '250 mL'],
+    # Junk, units the pattern does not know, and values that only start like a weight
+    ['9SLFNTJP0D', '', 'x', '500', 'kg', '5 lb', '12 x junk', 'g500', '1 x', '500gr'],
+    # Missing values
+    [np.nan, None, '500g', np.nan, '2 x 10g'],
+])
+def test_matches_legacy_conversion(weights):
+    assert_matches_legacy(weights)
+
+
+def test_matches_legacy_conversion_on_synthetic_products():
+    products = SyntheticDataGenerator(scale=5).products()
+    assert_matches_legacy(products['weight'].tolist())
+
+
+def test_repeated_values_are_converted_per_row():
+    df = pd.DataFrame({'weight': ['500g', np.nan, '500g', '2 x 1kg', np.nan, '2 x 1kg']})
+    result = DataCleaning().convert_product_weights(df)['weight'].to_numpy(dtype=float)
+    np.testing.assert_array_equal(result, [0.5, np.nan, 0.5, 2.0, np.nan, 2.0])
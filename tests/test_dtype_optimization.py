@@ -0,0 +1,18 @@
+import numpy as np
+import pandas as pd
+
+from dtype_optimization import TABLE_SCHEMAS, optimize_dtypes
+
+
+def test_float_columns_keep_values_float32_cannot_hold():
+    df = pd.DataFrame({'weight': [1.6, 0.1, 0.0283495, np.nan]})
+    result = optimize_dtypes(df, TABLE_SCHEMAS['dim_products'])
+    assert result['weight'].dtype == 'float64'
+    np.testing.assert_array_equal(result['weight'].to_numpy(), df['weight'].to_numpy())
+
+
+def test_float_columns_are_narrowed_when_lossless():
+    df = pd.DataFrame({'weight': [0.5, 2.0, 0.125, np.nan]})
+    result = optimize_dtypes(df, TABLE_SCHEMAS['dim_products'])
+    assert result['weight'].dtype == 'float32'
+    np.testing.assert_array_equal(result['weight'].to_numpy(dtype='float64'), df['weight'].to_numpy())
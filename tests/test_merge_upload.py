@@ -0,0 +1,17 @@
+import pandas as pd
+from sqlalchemy import create_engine
+
+from data_utils import DatabaseConnector
+
+
+def test_merge_keeps_the_last_row_of_a_repeated_key():
+    engine = create_engine('sqlite://')
+    connector = DatabaseConnector()
+    assert connector.upload_to_db(pd.DataFrame({'store_code': ['A', 'B'], 'staff_numbers': [1, 2]}),
+                                  'dim_store_details', engine)
+
+    batch = pd.DataFrame({'store_code': ['A', 'C', 'A'], 'staff_numbers': [10, 3, 11]})
+    assert connector.upload_to_db(batch, 'dim_store_details', engine, mode='merge')
+
+    result = pd.read_sql('SELECT store_code, staff_numbers FROM dim_store_details ORDER BY store_code', engine)
+    assert result.values.tolist() == [['A', 11], ['B', 2], ['C', 3]]
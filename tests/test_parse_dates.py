@@ -0,0 +1,70 @@
+import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from date_parsing import KNOWN_DATE_FORMATS, parse_dates
+from synthetic_data import SyntheticDataGenerator
+
+# Dates spread across days, months and decades, including single-digit days and months
+SAMPLE_DATES = pd.date_range('1968-02-29', '2023-12-31', periods=97).append(
+    pd.DatetimeIndex(['2000-01-01', '1999-12-31 23:59:59', '2020-02-29 12:05:07']))
+
+
+def assert_matches_mixed(values, index=None, name='date'):
+    series = pd.Series(values, index=index, name=name, dtype=object)
+    expected = pd.to_datetime(series, errors='coerce', format='mixed')
+    pd.testing.assert_series_equal(parse_dates(series), expected)
+
+
+@pytest.mark.parametrize('fmt', KNOWN_DATE_FORMATS)
+def test_matches_mixed_parser_for_each_known_format(fmt):
+    assert_matches_mixed(SAMPLE_DATES.strftime(fmt).tolist())
+
+
+@pytest.mark.parametrize('fmt', KNOWN_DATE_FORMATS)
+def test_matches_mixed_parser_with_junk_and_missing_values(fmt):
+    values = SAMPLE_DATES.strftime(fmt).tolist()
+    values[::7] = ['NULL'] * len(values[::7])
+    values[3::11] = [None] * len(values[3::11])
+    values[5::13] = [np.nan] * len(values[5::13])
+    values[1::17] = ['GMFSYGKZV7'] * len(values[1::17])
+    assert_matches_mixed(values)
+
+
+def test_matches_mixed_parser_for_all_known_formats_together():
+    values = [date.strftime(KNOWN_DATE_FORMATS[i % len(KNOWN_DATE_FORMATS)]) for i, date in enumerate(SAMPLE_DATES)]
+    assert_matches_mixed(values, index=np.arange(len(values)) * 3)
+
+
+def test_matches_mixed_parser_for_unlisted_formats():
+    assert_matches_mixed(['2020-01-05T10:30:00', 'January 5, 2020', '05/01/2020', '2020.01.05', '2020-01-05',
+                          '  2020-01-05', '2020-13-01', ''])
+
+
+def test_falls_back_to_mixed_parser_for_timezone_aware_values():
+    values = ['2020-01-05 10:30:00+01:00', '2021-06-01T08:00:00+01:00', None]
+    assert_matches_mixed(values)
+    assert isinstance(parse_dates(pd.Series(values, dtype=object)).dtype, pd.DatetimeTZDtype)
+
+
+@pytest.mark.filterwarnings('ignore:.*mixed time zones:FutureWarning')
+def test_falls_back_to_mixed_parser_for_naive_and_aware_values():
+    assert_matches_mixed(['2020-01-05 10:30:00+01:00', '2021-06-01 08:00:00-05:00', '2020-01-05', None])
+
+
+def test_matches_mixed_parser_for_non_string_values():
+    assert_matches_mixed([pd.Timestamp('2020-01-05 10:30'), datetime.datetime(2021, 6, 1, 8), datetime.date(2019, 3, 2),
+                          np.datetime64('2018-07-04'), '2020-01-05', None, np.nan])
+
+
+@pytest.mark.filterwarnings('ignore:.*un-recognized timezone:FutureWarning')
+def test_matches_mixed_parser_on_synthetic_dates():
+    products = SyntheticDataGenerator(scale=5).products()
+    assert_matches_mixed(products['date_added'].tolist(), index=products.index)
+
+
+def test_returns_datetime_columns_unchanged():
+    series = pd.Series(pd.to_datetime(['2020-01-05', None]), name='date')
+    assert parse_dates(series) is series
@@ -0,0 +1,121 @@
+import numpy as np
+import pandas as pd
+from cleaning_kernels import is_numeric
+
+# Format check for email addresses, applied when DataCleaning(validate_email=True)
+EMAIL_PATTERN = r'^[\w\.-]+@[\w\.-]+\.\w+$'
+
+# Row validation rules of each table, in the order the cleaning steps applied them. A rule has a
+# 'name' (the filter step reported in the metrics), a 'check' and the check's parameters:
+# - 'required': every column in 'columns' has a value
+# - 'pattern': 'column' matches the regular expression 'pattern'
+# - 'numeric': 'column' consists only of numeric characters
+# - 'range': 'column' lies within 'min' and/or 'max' (inclusive)
+# - 'allowed': 'column' is one of 'values'
+# 'unless' exempts rows where a column has a given value, and 'raw' evaluates the rule on the data as
+# extracted instead of after the column conversions (e.g. to tell missing values from unparseable ones).
+VALIDATION_RULES = {
+    'dim_users': [
+        {'name': 'missing_values', 'check': 'required', 'raw': True,
+         'columns': ['first_name', 'last_name', 'email_address', 'join_date', 'date_of_birth']},
+        {'name': 'invalid_dates', 'check': 'required', 'columns': ['join_date', 'date_of_birth']},
+        {'name': 'invalid_email', 'check': 'pattern', 'column': 'email_address', 'pattern': EMAIL_PATTERN},
+    ],
+    'dim_card_details': [
+        {'name': 'missing_values', 'check': 'required', 'raw': True,
+         'columns': ['card_number', 'expiry_date', 'card_provider', 'date_payment_confirmed']},
+        {'name': 'non_numeric_card_number', 'check': 'numeric', 'column': 'card_number'},
+        {'name': 'invalid_expiry_date', 'check': 'required', 'columns': ['expiry_date']},
+        {'name': 'invalid_payment_date', 'check': 'required', 'columns': ['date_payment_confirmed']},
+    ],
+    'dim_store_details': [
+        {'name': 'missing_values', 'check': 'required', 'raw': True, 'columns': ['store_code', 'opening_date']},
+        {'name': 'missing_coordinates', 'check': 'required', 'columns': ['latitude', 'longitude'],
+         'unless': {'store_type': 'Web Portal'}},
+        {'name': 'invalid_staff_numbers', 'check': 'range', 'column': 'staff_numbers', 'min': 0},
+    ],
+    'dim_products': [
+        {'name': 'missing_values', 'check': 'required', 'raw': True,
+         'columns': ['product_name', 'product_price', 'category', 'EAN', 'date_added', 'uuid', 'product_code']},
+        {'name': 'invalid_price_or_weight', 'check': 'required', 'columns': ['product_price', 'weight']},
+    ],
+    'orders_table': [
+        {'name': 'missing_values', 'check': 'required', 'raw': True,
+         'columns': ['user_uuid', 'card_number', 'store_code', 'product_code', 'product_quantity']},
+        {'name': 'non_numeric_card_number', 'check': 'numeric', 'column': 'card_number'},
+        {'name': 'invalid_quantity', 'check': 'range', 'column': 'product_quantity', 'min': 0},
+    ],
+    'dim_date_times': [
+        {'name': 'invalid_timestamp', 'check': 'required', 'columns': ['timestamp']},
+    ],
+}
+
+
+def _required(df, rule):
+    return df[rule['columns']].notna().all(axis=1).to_numpy()
+
+
+def _pattern(df, rule):
+    # Match each distinct value once and broadcast the result back to the rows
+    codes, uniques = pd.factorize(df[rule['column']])
+    matched = pd.Series(uniques, dtype=object).str.contains(rule['pattern'], regex=True, na=False)
+    # Missing values are coded as -1, which picks the trailing False
+    return np.append(matched.to_numpy(dtype=bool), False)[codes]
+
+
+def _numeric(df, rule):
+    return is_numeric(df[rule['column']]).to_numpy()
+
+
+def _range(df, rule):
+    values = pd.to_numeric(df[rule['column']], errors='coerce')
+    passed = values.notna()
+    if rule.get('min') is not None:
+        passed &= values >= rule['min']
+    if rule.get('max') is not None:
+        passed &= values <= rule['max']
+    return passed.to_numpy()
+
+
+def _allowed(df, rule):
+    return df[rule['column']].isin(rule['values']).to_numpy()
+
+
+CHECKS = {
+    'required': _required,
+    'pattern': _pattern,
+    'numeric': _numeric,
+    'range': _range,
+    'allowed': _allowed,
+}
+
+
+def evaluate_rules(df, rules, raw=None, skip=()):
+    """
+    Evaluates validation rules over all rows at once and combines them into a single mask, so the
+    data is filtered once instead of once per rule.
+
+    Args:
+    df (pd.DataFrame): The data after the column conversions.
+    rules (list): The rules to apply, e.g. VALIDATION_RULES['dim_users'].
+    raw (pd.DataFrame): The data as extracted, with the same rows, for rules marked 'raw'
+        (default None, evaluate them on `df`).
+    skip (iterable): Names of rules to leave out.
+
+    Returns:
+    tuple: A boolean array of the rows passing every rule, and a dict of the rows rejected per rule.
+        A row failing several rules counts against the first one, as if they were applied in turn.
+    """
+    keep = np.ones(len(df), dtype=bool)
+    rejected = {}
+    for rule in rules:
+        if rule['name'] in skip:
+            continue
+        frame = raw if rule.get('raw') and raw is not None else df
+        passed = CHECKS[rule['check']](frame, rule)
+        for column, value in rule.get('unless', {}).items():
+            passed = passed | (frame[column] == value).to_numpy()
+
+        rejected[rule['name']] = int((keep & ~passed).sum())
+        keep &= passed
+    return keep, rejected